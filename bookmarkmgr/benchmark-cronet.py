@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+
+import argparse
+import asyncio
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import chain
+import statistics
+import threading
+import time
+import timeit
+from typing import override
+
+from yarl import URL
+
+from bookmarkmgr.cronet import Session
+from bookmarkmgr.cronet._cronet import lib
+from bookmarkmgr.cronet.default_headers import DEFAULT_HEADERS
+from bookmarkmgr.cronet.utils import destroying
+
+_URL = URL("https://example.com/")
+_COOKIE_HEADERS = ["foo=bar", "bar=foo"]
+
+
+def _add_request_headers_per_header(cookie_header: str) -> None:
+    with destroying(
+        lib.Cronet_UrlRequestParams_Create(),
+        lib.Cronet_UrlRequestParams_Destroy,
+    ) as parameters:
+        for name, value in chain(
+            DEFAULT_HEADERS,
+            [("Cookie", cookie_header)],
+        ):
+            with destroying(
+                lib.Cronet_HttpHeader_Create(),
+                lib.Cronet_HttpHeader_Destroy,
+            ) as header:
+                lib.Cronet_HttpHeader_name_set(header, name.encode())
+                lib.Cronet_HttpHeader_value_set(header, value.encode())
+
+                lib.Cronet_UrlRequestParams_request_headers_add(
+                    parameters,
+                    header,
+                )
+
+
+def _add_request_headers_prepared(session: Session) -> None:
+    with destroying(
+        lib.Cronet_UrlRequestParams_Create(),
+        lib.Cronet_UrlRequestParams_Destroy,
+    ) as parameters:
+        session._add_request_headers(parameters, _URL)  # noqa: SLF001
+
+
+def _report(name: str, seconds: float, number: int) -> None:
+    print(f"{name}: {seconds / number * 1e6:.2f} µs/request")  # noqa: T201
+
+
+def benchmark_request_headers(number: int) -> None:
+    session = Session()
+    session.cookie_jar.extract_cookies(_URL, _COOKIE_HEADERS)
+
+    _report(
+        "Per-header",
+        timeit.timeit(
+            lambda: _add_request_headers_per_header(
+                "; ".join(_COOKIE_HEADERS),
+            ),
+            number=number,
+        ),
+        number,
+    )
+    _report(
+        "Prepared",
+        timeit.timeit(
+            lambda: _add_request_headers_prepared(session),
+            number=number,
+        ),
+        number,
+    )
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        body = b"<html></html>"
+
+        self.send_response(HTTPStatus.OK.value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    @override
+    def log_message(self, *args: object, **kwargs: object) -> None:
+        pass
+
+
+async def _measure_latencies(
+    url: str,
+    number: int,
+    *,
+    direct_executor: bool,
+) -> list[float]:
+    latencies = []
+
+    async with Session(direct_executor=direct_executor) as session:
+        # Warms up the connection.
+        await session.get(url, allow_redirects=False)
+
+        for _ in range(number):
+            start = time.perf_counter()
+            await session.get(url, allow_redirects=False)
+            latencies.append(time.perf_counter() - start)
+
+    return latencies
+
+
+def benchmark_latency(number: int) -> None:
+    with ThreadingHTTPServer(("127.0.0.1", 0), _RequestHandler) as server:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        url = f"http://127.0.0.1:{server.server_port}/"
+
+        for name, direct_executor in [
+            ("Queued executor", False),
+            ("Direct executor", True),
+        ]:
+            latencies = asyncio.run(
+                _measure_latencies(
+                    url,
+                    number,
+                    direct_executor=direct_executor,
+                ),
+            )
+
+            print(  # noqa: T201
+                f"{name}: "
+                f"mean {statistics.mean(latencies) * 1e6:.0f} µs, "
+                f"median {statistics.median(latencies) * 1e6:.0f} µs",
+            )
+
+        server.shutdown()
+
+
+arg_parser = argparse.ArgumentParser()
+arg_parser.add_argument(
+    "benchmark",
+    choices=["latency", "request-headers"],
+)
+arg_parser.add_argument(
+    "-n",
+    "--number",
+    default=1000,
+    help="Number of iterations",
+    type=int,
+)
+args = arg_parser.parse_args()
+
+match args.benchmark:
+    case "latency":
+        benchmark_latency(args.number)
+    case "request-headers":
+        benchmark_request_headers(args.number)
+    case _:
+        pass
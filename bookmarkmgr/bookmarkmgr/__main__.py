@@ -5,22 +5,70 @@ import asyncio
 import contextlib
 import logging
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import cast, TYPE_CHECKING
 
 from . import DEBUG
 from .clients.raindrop import RaindropClient
+from .commands.estimate_maintenance import estimate_maintenance
 from .commands.export_collection import export_collection
 from .commands.maintain_collection import (
     maintain_collection,
     MaintainCollectionOptions,
+    PriorityPolicy,
 )
+from .journal import Journal
+from .logging import LOG_FORMAT
+from .scraper import ProbeMethod
 
 if TYPE_CHECKING:
     from collections.abc import Callable
 
+_ALL_COLLECTIONS = "all"
+
 _HOST_RATE_LIMIT_METAVAR = ("hostname", "limit", "period", "jitter")
 _HOST_RATE_LIMIT_NARGS = len(_HOST_RATE_LIMIT_METAVAR)
 
+_PROBE_HOST_METAVAR = ("hostname", "{head,range}")
+_PROBE_HOST_NARGS = len(_PROBE_HOST_METAVAR)
+
+
+def _collection_id(value: str) -> int | str:
+    if value == _ALL_COLLECTIONS:
+        return value
+
+    try:
+        return int(value)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(error) from error
+
+
+def _shard(value: str) -> tuple[int, int]:
+    index, separator, count = value.partition("/")
+
+    try:
+        shard = int(index), int(count)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(error) from error
+
+    if not separator or not 1 <= shard[0] <= shard[1]:
+        message = f"invalid shard: {value}"
+        raise argparse.ArgumentTypeError(message)
+
+    return shard
+
+
+def _positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(error) from error
+
+    if number < 1:
+        message = f"not a positive integer: {value}"
+        raise argparse.ArgumentTypeError(message)
+
+    return number
+
 
 def _existing_file_path(str_path: str) -> Path:
     path = Path(str_path)
@@ -51,20 +99,75 @@ def _host_rate_limits_parser() -> Callable[[str], float | int | str]:
     return parse
 
 
+def _probe_hosts_parser() -> Callable[[str], ProbeMethod | str]:
+    index = -1
+
+    def parse(value: str) -> ProbeMethod | str:
+        nonlocal index
+
+        index = (index + 1) % _PROBE_HOST_NARGS
+
+        match index:
+            case 1:
+                try:
+                    return ProbeMethod(value)
+                except ValueError as error:
+                    raise argparse.ArgumentTypeError(error) from error
+            case _:
+                return value.lower()
+
+    return parse
+
+
+async def _get_collection_ids(
+    raindrop_client: RaindropClient,
+    collection_ids: list[int | str],
+) -> list[int]:
+    if _ALL_COLLECTIONS in collection_ids:
+        return await raindrop_client.get_collection_ids()
+
+    return list(dict.fromkeys(cast("list[int]", collection_ids)))
+
+
 async def run_command(args: argparse.Namespace, raindrop_api_key: str) -> None:
     async with RaindropClient(raindrop_api_key) as raindrop_client:
+        collection_ids = await _get_collection_ids(
+            raindrop_client,
+            args.collection_ids,
+        )
+
         match args.command:
             case "export-collection":
-                await export_collection(raindrop_client, args.collection_id)
+                await export_collection(
+                    raindrop_client,
+                    collection_ids,
+                    args.output,
+                )
             case "maintain-collection":
-                await maintain_collection(
+                command = (
+                    estimate_maintenance if args.plan else maintain_collection
+                )
+
+                await command(
                     raindrop_client,
-                    args.collection_id,
+                    collection_ids,
                     MaintainCollectionOptions(
                         args.host_rate_limits,
                         args.no_archive,
                         args.no_archive_broken,
                         args.no_checks,
+                        args.cookie_file,
+                        dict(args.probe_hosts),
+                        args.journal_file,
+                        args.resume,
+                        args.snapshot_file,
+                        args.search,
+                        args.load_from_export,
+                        args.export_to,
+                        args.export_index_file,
+                        args.priority_policies,
+                        args.shard,
+                        args.workers,
                     ),
                 )
             case _:
@@ -73,7 +176,7 @@ async def run_command(args: argparse.Namespace, raindrop_api_key: str) -> None:
 
 def _main() -> None:
     logging.basicConfig(
-        format=f"%(asctime)s:{logging.BASIC_FORMAT}",
+        format=LOG_FORMAT,
         level=logging.WARNING if DEBUG else logging.ERROR,
     )
 
@@ -92,9 +195,20 @@ def _main() -> None:
         help="Exports bookmarks in HTML to stdout",
     )
     export_collection_parser.add_argument(
-        "collection_id",
-        help="ID of a collection to be exported",
-        type=int,
+        "collection_ids",
+        help=f"IDs of collections to be exported, or {_ALL_COLLECTIONS}",
+        metavar="collection_id",
+        nargs="+",
+        type=_collection_id,
+    )
+    export_collection_parser.add_argument(
+        "--output",
+        help=(
+            "Writes the export atomically to a file instead, unless its "
+            "content is unchanged. Exports of multiple collections are "
+            "written to files with collection IDs appended to their names"
+        ),
+        type=Path,
     )
 
     maintain_collection_parser = subparsers.add_parser(
@@ -102,9 +216,32 @@ def _main() -> None:
         help="Archives bookmarked links",
     )
     maintain_collection_parser.add_argument(
-        "collection_id",
-        help="ID of a collection to be maintained",
-        type=int,
+        "collection_ids",
+        help=f"IDs of collections to be maintained, or {_ALL_COLLECTIONS}",
+        metavar="collection_id",
+        nargs="+",
+        type=_collection_id,
+    )
+    maintain_collection_parser.add_argument(
+        "--cookie-file",
+        help="Persists link check cookies in a cookies.txt file",
+        type=Path,
+    )
+    maintain_collection_parser.add_argument(
+        "--export-index-file",
+        help=(
+            "Keeps offsets of bookmarks in the export in a file, so that only "
+            "changed bookmarks are rewritten by the next export"
+        ),
+        type=Path,
+    )
+    maintain_collection_parser.add_argument(
+        "--export-to",
+        help=(
+            "Exports maintained bookmarks in HTML to a file, as "
+            "export-collection --output does, without loading them again"
+        ),
+        type=Path,
     )
     maintain_collection_parser.add_argument(
         "--host-rate-limit",
@@ -116,6 +253,22 @@ def _main() -> None:
         nargs=_HOST_RATE_LIMIT_NARGS,
         type=_host_rate_limits_parser(),
     )
+    maintain_collection_parser.add_argument(
+        "--journal-file",
+        help=(
+            "Journals maintenance results, so that an interrupted run can be "
+            "resumed"
+        ),
+        type=Path,
+    )
+    maintain_collection_parser.add_argument(
+        "--load-from-export",
+        action="store_true",
+        help=(
+            "Loads raindrops from a CSV export of the collection in a single "
+            "request instead of by pages"
+        ),
+    )
     maintain_collection_parser.add_argument(
         "--no-archive",
         action="store_true",
@@ -131,9 +284,133 @@ def _main() -> None:
         action="store_true",
         help="Disables broken link checks",
     )
+    maintain_collection_parser.add_argument(
+        "--plan",
+        action="store_true",
+        help=(
+            "Loads the collection and prints a lower bound of the duration "
+            "of its maintenance and the slowest hosts, without maintaining it "
+            "or writing any files"
+        ),
+    )
+    maintain_collection_parser.add_argument(
+        "--priority",
+        action="append",
+        choices=list(PriorityPolicy),
+        default=[],
+        dest="priority_policies",
+        help=(
+            "Checks and archives raindrops in order of a policy: newest "
+            "first, blocked and possibly broken links first, or least "
+            "recently checked first. Later policies break ties of earlier "
+            "ones"
+        ),
+        type=PriorityPolicy,
+    )
+    maintain_collection_parser.add_argument(
+        "--probe-host",
+        action="append",
+        default=[],
+        dest="probe_hosts",
+        help=(
+            "Finds out the content type of links to a hostname before "
+            "loading them, so that bodies of non-HTML resources are not "
+            "downloaded"
+        ),
+        metavar=_PROBE_HOST_METAVAR,
+        nargs=_PROBE_HOST_NARGS,
+        type=_probe_hosts_parser(),
+    )
+    maintain_collection_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=(
+            "Resumes an interrupted run by sending its unsent updates and "
+            "skipping completed links"
+        ),
+    )
+    maintain_collection_parser.add_argument(
+        "--search",
+        help=(
+            "Maintains only raindrops matching a Raindrop search query, "
+            "e.g. #possibly-broken, without detecting duplicates"
+        ),
+    )
+    maintain_collection_parser.add_argument(
+        "--shard",
+        help=(
+            "Maintains only raindrops with links to hosts of a shard, e.g. "
+            "1/4, so that shards can be maintained by separate processes. "
+            "Duplicates are still detected among all raindrops. Journal and "
+            "cookie files must not be shared by shards"
+        ),
+        metavar="K/N",
+        type=_shard,
+    )
+    maintain_collection_parser.add_argument(
+        "--snapshot-file",
+        help=(
+            "Keeps a local copy of the collection, so that only raindrops "
+            "updated since the last run are loaded. Copies of multiple "
+            "collections are kept in files with collection IDs appended to "
+            "their names"
+        ),
+        type=Path,
+    )
+    maintain_collection_parser.add_argument(
+        "--workers",
+        help=(
+            "Checks links in a number of processes, each checking links to "
+            "its own hosts, so that pages are parsed on multiple cores. "
+            "Links are archived by the main process"
+        ),
+        metavar="N",
+        type=_positive_int,
+    )
 
     args = arg_parser.parse_args()
 
+    if args.command == "maintain-collection":
+        if args.resume and args.journal_file is None:
+            arg_parser.error("--resume requires --journal-file")
+
+        # Unsent updates of an interrupted run would be lost.
+        if (
+            args.journal_file is not None
+            and not args.resume
+            and not args.plan
+            and Journal.is_unfinished(args.journal_file)
+        ):
+            arg_parser.error(
+                f"{args.journal_file} is of an unfinished run, which can be "
+                "resumed by --resume",
+            )
+
+        if (
+            sum(
+                [
+                    args.load_from_export,
+                    args.search is not None,
+                    args.snapshot_file is not None,
+                ],
+            )
+            > 1
+        ):
+            arg_parser.error(
+                "only one of --load-from-export, --search and --snapshot-file "
+                "can be used",
+            )
+
+        if args.export_to is not None and args.search is not None:
+            arg_parser.error("--export-to cannot be used with --search")
+
+        if args.export_index_file is not None and args.export_to is None:
+            arg_parser.error("--export-index-file requires --export-to")
+
+        # Exports of shards would lack updates of raindrops of other shards.
+        if args.export_to is not None and args.shard is not None:
+            arg_parser.error("--export-to cannot be used with --shard")
+
     with args.raindrop_api_key_file.open() as f:
         api_key: str = f.read().strip()
 
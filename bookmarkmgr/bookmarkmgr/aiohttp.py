@@ -32,6 +32,7 @@ from aiohttp_retry import (
     RetryOptionsBase,
 )
 
+from .asyncio import BudgetRateLimiter
 from .logging import get_logger
 
 if TYPE_CHECKING:
@@ -105,6 +106,19 @@ async def on_request_exception(
     )
 
 
+def _parse_rate_limit_headers(
+    response: ClientResponse,
+) -> tuple[int, int, float] | None:
+    try:
+        return (
+            int(response.headers["X-RateLimit-Limit"]),
+            int(response.headers["X-RateLimit-Remaining"]),
+            float(response.headers["X-RateLimit-Reset"]),
+        )
+    except KeyError, ValueError:
+        return None
+
+
 trace_config = TraceConfig()
 trace_config.on_request_end.append(on_request_end)
 trace_config.on_request_exception.append(on_request_exception)
@@ -286,7 +300,14 @@ class RateLimitedClientSession(ClientSession):
         **kwargs: Unpack[_InternalRequestOptions],
     ) -> ClientResponse:
         async with self.__rate_limiter:
-            return await super()._request(method, str_or_url, **kwargs)
+            response = await super()._request(method, str_or_url, **kwargs)
+
+            if isinstance(self.__rate_limiter, BudgetRateLimiter) and (
+                budget := _parse_rate_limit_headers(response)
+            ):
+                self.__rate_limiter.update_budget(*budget)
+
+            return response
 
     @override
     async def close(self) -> None:
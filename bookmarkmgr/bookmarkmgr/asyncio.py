@@ -1,5 +1,9 @@
 import asyncio
-from asyncio import AbstractEventLoop, Event, Lock, Semaphore, Task, TaskGroup
+from asyncio import Future, Lock, Task, TaskGroup, TimerHandle
+from contextlib import AbstractContextManager, contextmanager
+from contextvars import ContextVar
+import heapq
+import itertools
 import random
 import time
 from typing import cast, override, TYPE_CHECKING
@@ -9,7 +13,7 @@ from overrides import override as runtime_override
 from .logging import get_logger
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Generator
 
 logger = get_logger()
 
@@ -54,6 +58,28 @@ class ForgivingTaskGroup(TaskGroup):
         self._parent_cancel_requested = parent_cancel_requested
 
 
+type Priority = tuple[float, ...]
+
+_DEFAULT_PRIORITY: Priority = (1,)
+_HIGH_PRIORITY: Priority = (0,)
+
+_request_priority = ContextVar("request_priority", default=_DEFAULT_PRIORITY)
+
+
+@contextmanager
+def request_priority(priority: Priority) -> Generator[None]:
+    """Set priority of requests waiting for rate limiters."""
+    token = _request_priority.set(priority)
+    try:
+        yield
+    finally:
+        _request_priority.reset(token)
+
+
+def get_request_priority() -> Priority:
+    return _request_priority.get()
+
+
 # https://github.com/mjpieters/aiolimiter and
 # https://github.com/ArtyomKozyrev8/BucketRateLimiter provide inadequate
 # performance. See https://github.com/mjpieters/aiolimiter/issues/73.
@@ -67,11 +93,29 @@ class RateLimiter:
         self.jitter = jitter
         self.period = period
 
-        self._semaphore = Semaphore(limit)
+        self._available = limit
         self._release_tasks: set[Task[None]] = set()
+        self._waiter_counter = itertools.count()
+        self._waiters: list[tuple[Priority, int, Future[None]]] = []
 
     async def __aenter__(self) -> None:
-        await self._semaphore.acquire()
+        if self._available > 0 and not self._waiters:
+            self._available -= 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._waiters,
+            (_request_priority.get(), next(self._waiter_counter), waiter),
+        )
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot()
+
+            raise
 
     async def __aexit__(self, *_: object) -> None:
         jitter = random.uniform(0, self.jitter)  # noqa: S311
@@ -85,7 +129,17 @@ class RateLimiter:
         if (remaining := at - time.time()) > 0:
             await asyncio.sleep(remaining)
 
-        self._semaphore.release()
+        self._release_slot()
+
+    def _release_slot(self) -> None:
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+        self._available += 1
 
     def _release_task_done(self, task: Task[None]) -> None:
         self._release_tasks.remove(task)
@@ -98,23 +152,99 @@ class RateLimiter:
             task.cancel()
 
 
-class ThreadSafeEvent(Event):
-    """CAVEAT: clear() and set() don't take effect immediately."""
+class BudgetRateLimiter(RateLimiter):
+    """Rate limiter pacing requests by the budget reported by a server."""
 
-    _loop: AbstractEventLoop
+    def __init__(self, limit: int, period: float = 60) -> None:
+        super().__init__(limit, period)
 
-    def __init__(self) -> None:
-        super().__init__()
+        self._dispatch_handle: TimerHandle | None = None
+        self._last_grant = float("-inf")
+        self._limit = limit
+        self._remaining = limit
+        self._reset = time.time() + period
 
-        self._loop = asyncio.get_event_loop()
+    @override
+    async def __aenter__(self) -> None:
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._waiters,
+            (_request_priority.get(), next(self._waiter_counter), waiter),
+        )
+
+        self._dispatch()
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The request wasn't sent, so its budget is returned.
+                self._remaining += 1
+                self._dispatch()
+
+            raise
 
     @override
-    def clear(self) -> None:
-        self._loop.call_soon_threadsafe(super().clear)
+    async def __aexit__(self, *_: object) -> None:
+        pass
+
+    def _dispatch(self) -> None:
+        if self._dispatch_handle is not None:
+            self._dispatch_handle.cancel()
+            self._dispatch_handle = None
+
+        while self._waiters:
+            if self._waiters[0][2].done():
+                heapq.heappop(self._waiters)
+                continue
+
+            now = time.time()
+
+            if now >= self._reset:
+                self._remaining = self._limit
+                self._reset = now + self.period
+
+            if self._remaining > 0:
+                ready_at = (
+                    self._last_grant + (self._reset - now) / self._remaining
+                )
+            else:
+                ready_at = self._reset
+
+            if ready_at > now:
+                self._dispatch_handle = asyncio.get_running_loop().call_later(
+                    ready_at - now,
+                    self._dispatch,
+                )
+                break
+
+            _, _, waiter = heapq.heappop(self._waiters)
+            waiter.set_result(None)
+
+            self._last_grant = now
+            self._remaining -= 1
 
     @override
-    def set(self) -> None:
-        self._loop.call_soon_threadsafe(super().set)
+    def close(self) -> None:
+        if self._dispatch_handle is not None:
+            self._dispatch_handle.cancel()
+
+    @staticmethod
+    def prioritized() -> AbstractContextManager[None]:
+        return request_priority(_HIGH_PRIORITY)
+
+    def update_budget(self, limit: int, remaining: int, reset: float) -> None:
+        self._limit = limit
+
+        # A later reset means that the server started a new window.
+        if reset > self._reset:
+            self._remaining = remaining
+        else:
+            self._remaining = min(remaining, self._remaining)
+
+        self._reset = reset
+
+        self._dispatch()
 
 
 _GILED_CPU_THREAD_LOCK = Lock()
@@ -57,9 +57,10 @@ class DuplicateLinkChecker:
         self._link_count += 1
         self._process_links()
 
-    async def is_link_duplicate(self, raindrop: RaindropOut) -> bool:
+    def is_duplicate(self, raindrop: RaindropOut) -> bool:
         if not self._all_links_received.is_set():
-            await self._all_links_received.wait()
+            message = "Not all links have been added yet"
+            raise RuntimeError(message)
 
         url = raindrop["link"]
         queryless_url = _remove_query_from_url(url)
@@ -72,6 +73,12 @@ class DuplicateLinkChecker:
 
         return original_link < tested_link
 
+    async def is_link_duplicate(self, raindrop: RaindropOut) -> bool:
+        if not self._all_links_received.is_set():
+            await self._all_links_received.wait()
+
+        return self.is_duplicate(raindrop)
+
     def set_required_link_count(self, count: int) -> None:
         self._required_link_count = count
         self._process_links()
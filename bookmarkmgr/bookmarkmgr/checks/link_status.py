@@ -8,10 +8,11 @@ import tld
 from tld import get_tld
 from yarl import URL
 
+from bookmarkmgr import scraper
 from bookmarkmgr.cronet import RequestError
 
 if TYPE_CHECKING:
-    from bookmarkmgr import scraper
+    from bookmarkmgr.cronet import RetrySession
 
 REDIRECT_STATUS_CODES = {
     HTTPStatus.MOVED_PERMANENTLY.value,
@@ -54,6 +55,15 @@ class LinkStatus(IntEnum):
     BLOCKED = 4
 
 
+# Page, status, error message and fixed URL of a checked link.
+type LinkCheckResult = tuple[
+    scraper.Page | None,
+    LinkStatus,
+    str | None,
+    str | None,
+]
+
+
 def check_link_status(
     scraper_result: scraper.Result,
 ) -> tuple[LinkStatus, str | None]:
@@ -182,3 +192,35 @@ def get_fixed_url(response: scraper.Response, url: str) -> str | None:
                 return response.redirect_url
 
     return None
+
+
+async def scrape_and_check(
+    session: RetrySession,
+    url: str,
+    probe_method: scraper.ProbeMethod | None = None,
+) -> LinkCheckResult:
+    scraper_result = await scraper.scrape_page(session, url, probe_method)
+    link_status, error = check_link_status(scraper_result)
+
+    if isinstance(scraper_result, RequestError):
+        return None, link_status, error, None
+
+    if (fixed_url := get_fixed_url(scraper_result.response, url)) is None:
+        return scraper_result.page, link_status, error, None
+
+    old_page = scraper_result.page
+
+    scraper_result = await scraper.scrape_page(
+        session,
+        fixed_url,
+        probe_method,
+    )
+    fixed_link_status, fixed_error = check_link_status(scraper_result)
+
+    if (
+        isinstance(scraper_result, scraper.ScrapedData)
+        and fixed_link_status == LinkStatus.OK
+    ):
+        return scraper_result.page, fixed_link_status, fixed_error, fixed_url
+
+    return old_page, link_status, error, None
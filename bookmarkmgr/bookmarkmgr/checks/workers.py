@@ -0,0 +1,390 @@
+import asyncio
+import contextlib
+from dataclasses import dataclass, field, replace
+import hashlib
+import itertools
+import logging
+import multiprocessing
+import queue
+import threading
+from typing import cast, NamedTuple, Self, TYPE_CHECKING
+
+from tld import get_fld
+from yarl import URL
+
+from bookmarkmgr.asyncio import get_request_priority, request_priority
+from bookmarkmgr.checks.link_status import LinkCheckResult, scrape_and_check
+from bookmarkmgr.cronet import PerHostnameRateLimitedSession
+from bookmarkmgr.cronet.cookies import CookieStore
+from bookmarkmgr.logging import LOG_FORMAT
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+    from http.cookiejar import Cookie
+    from multiprocessing.connection import Connection
+    from pathlib import Path
+
+    from bookmarkmgr.asyncio import Priority
+    from bookmarkmgr.cronet import RetrySession
+    from bookmarkmgr.scraper import ProbeMethod
+
+
+type SessionChecker = Callable[
+    [RetrySession, str, ProbeMethod | None],
+    Awaitable[LinkCheckResult],
+]
+
+
+class CheckWorkerError(Exception):
+    pass
+
+
+class _Request(NamedTuple):
+    request_id: int
+    url: str
+    probe_method: ProbeMethod | None
+    priority: Priority
+
+
+class _Result(NamedTuple):
+    request_id: int
+    result: LinkCheckResult
+
+
+class _Error(NamedTuple):
+    request_id: int
+    message: str
+
+
+# Sent by a worker when it's stopped.
+class _Cookies(NamedTuple):
+    cookies: list[Cookie]
+
+
+type _Message = _Result | _Error | _Cookies
+
+# Index of the worker and future of a check.
+type _PendingCheck = tuple[int, asyncio.Future[LinkCheckResult]]
+
+
+def get_worker_index(host: str, worker_count: int) -> int:
+    """Return the index of the worker checking links to a host."""
+    host = host.lower()
+    domain = get_fld(host, fail_silently=True, fix_protocol=True)
+    # Shards are partitioned by CRC-32 of hosts, whose remainders would be
+    # correlated with those of any CRC-32 (even salted), so that hosts of a
+    # shard would be checked by only some of the workers.
+    digest = hashlib.blake2b((domain or host).encode(), digest_size=8)
+
+    return int.from_bytes(digest.digest()) % worker_count
+
+
+async def _check(
+    connection: Connection,
+    checker: SessionChecker,
+    session: RetrySession,
+    request: _Request,
+) -> None:
+    message: _Message
+
+    try:
+        page, link_status, error, fixed_url = await checker(
+            session,
+            request.url,
+            request.probe_method,
+        )
+    except Exception as error:  # noqa: BLE001
+        message = _Error(
+            request.request_id,
+            f"{type(error).__name__}: {error}",
+        )
+    else:
+        # Only metadata of pages is needed by the coordinator, so their bodies
+        # aren't sent back.
+        message = _Result(
+            request.request_id,
+            (
+                replace(page, body_text="") if page is not None else None,
+                link_status,
+                error,
+                fixed_url,
+            ),
+        )
+
+    # The coordinator may be gone if it was interrupted.
+    with contextlib.suppress(BrokenPipeError):
+        connection.send(message)
+
+
+async def _serve(
+    connection: Connection,
+    checker: SessionChecker,
+    cookie_file: Path | None,
+    host_rate_limits: list[tuple[str, int, float, float]],
+) -> None:
+    loop = asyncio.get_running_loop()
+    requests = asyncio.Queue[_Request | None]()
+    tasks = set[asyncio.Task[None]]()
+
+    def receive() -> None:
+        try:
+            request = cast("_Request | None", connection.recv())
+        except EOFError:
+            request = None
+
+        if request is None:
+            loop.remove_reader(connection.fileno())
+
+        requests.put_nowait(request)
+
+    async with PerHostnameRateLimitedSession(
+        cookie_file=cookie_file,
+        host_rate_limits=host_rate_limits,
+    ) as session:
+        # Loaded cookies are saved by the coordinator, as workers would
+        # overwrite each other's cookies.
+        session.cookie_jar.path = None
+
+        loop.add_reader(connection.fileno(), receive)
+
+        while (request := await requests.get()) is not None:
+            with request_priority(request.priority):
+                task = asyncio.create_task(
+                    _check(connection, checker, session, request),
+                    name=f"Check-{request.url}",
+                )
+
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        # Checks still running when the worker is stopped are no longer
+        # awaited by the coordinator.
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        with contextlib.suppress(BrokenPipeError):
+            connection.send(_Cookies(list(session.cookie_jar)))
+
+
+def _run_worker(
+    connection: Connection,
+    checker: SessionChecker,
+    cookie_file: Path | None,
+    host_rate_limits: list[tuple[str, int, float, float]],
+    log_level: int,
+) -> None:
+    logging.basicConfig(format=LOG_FORMAT, level=log_level)
+
+    # An interruption is handled by the coordinator, which gets interrupted
+    # too.
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(
+            _serve(connection, checker, cookie_file, host_rate_limits),
+        )
+
+    connection.close()
+
+
+def _send_requests(
+    connection: Connection,
+    requests: queue.SimpleQueue[_Request | None],
+) -> None:
+    while True:
+        request = requests.get()
+
+        try:
+            connection.send(request)
+        except OSError:
+            # The worker exited.
+            return
+
+        if request is None:
+            return
+
+
+@dataclass
+class _Worker:
+    process: multiprocessing.Process
+    connection: Connection
+    # Requests are sent by a thread, so that the event loop can't be blocked
+    # by a worker blocked on sending results while its pipe is full.
+    requests: queue.SimpleQueue[_Request | None]
+    sender: threading.Thread
+    exited: asyncio.Event = field(default_factory=asyncio.Event)
+    cookies: list[Cookie] | None = None
+
+
+class CheckWorkerPool:
+    """Pool of processes checking links."""
+
+    def __init__(
+        self,
+        worker_count: int,
+        *,
+        cookie_file: Path | None = None,
+        host_rate_limits: list[tuple[str, int, float, float]],
+        checker: SessionChecker = scrape_and_check,
+    ) -> None:
+        self.checker = checker
+        self.cookie_file = cookie_file
+        self.host_rate_limits = host_rate_limits
+        self.worker_count = worker_count
+
+        self._pending_checks: dict[int, _PendingCheck] = {}
+        self._request_ids = itertools.count()
+        self._workers: list[_Worker] = []
+
+    async def __aenter__(self) -> Self:
+        loop = asyncio.get_running_loop()
+
+        for index in range(self.worker_count):
+            connection, worker_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_run_worker,
+                args=(
+                    worker_connection,
+                    self.checker,
+                    self.cookie_file,
+                    self.host_rate_limits,
+                    logging.getLogger().level,
+                ),
+                name=f"Check-worker-{index}",
+            )
+            process.start()
+            worker_connection.close()
+
+            requests = queue.SimpleQueue[_Request | None]()
+            sender = threading.Thread(
+                target=_send_requests,
+                args=(connection, requests),
+                name=f"Check-worker-{index}-sender",
+                daemon=True,
+            )
+            sender.start()
+
+            self._workers.append(
+                _Worker(process, connection, requests, sender),
+            )
+            loop.add_reader(connection.fileno(), self._receive, index)
+
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        for worker in self._workers:
+            worker.requests.put(None)
+
+        for worker in self._workers:
+            await worker.exited.wait()
+
+        await asyncio.to_thread(self._join_workers)
+
+        if self.cookie_file is not None:
+            self._save_cookies()
+
+    def _join_workers(self) -> None:
+        for worker in self._workers:
+            worker.process.join()
+            worker.sender.join()
+            worker.connection.close()
+
+    def _on_worker_exit(self, index: int) -> None:
+        worker = self._workers[index]
+
+        asyncio.get_running_loop().remove_reader(worker.connection.fileno())
+        worker.exited.set()
+
+        message = f"Check worker {index} exited"
+
+        for worker_index, future in self._pending_checks.values():
+            if worker_index == index and not future.done():
+                future.set_exception(CheckWorkerError(message))
+
+    def _receive(self, index: int) -> None:
+        worker = self._workers[index]
+
+        try:
+            message = cast("_Message", worker.connection.recv())
+        except EOFError:
+            self._on_worker_exit(index)
+            return
+
+        match message:
+            case _Cookies(cookies):
+                worker.cookies = cookies
+            case _Result(request_id, result):
+                if (
+                    future := self._get_pending_future(request_id)
+                ) is not None:
+                    future.set_result(result)
+            case _Error(request_id, error_message):
+                if (
+                    future := self._get_pending_future(request_id)
+                ) is not None:
+                    future.set_exception(CheckWorkerError(error_message))
+
+    # Results of cancelled checks are discarded.
+    def _get_pending_future(
+        self,
+        request_id: int,
+    ) -> asyncio.Future[LinkCheckResult] | None:
+        if (pending_check := self._pending_checks.get(request_id)) is None:
+            return None
+
+        _, future = pending_check
+
+        return None if future.done() else future
+
+    def _get_cookie_worker_index(self, cookie: Cookie) -> int:
+        return get_worker_index(cookie.domain.lstrip("."), self.worker_count)
+
+    def _save_cookies(self) -> None:
+        loaded_cookies = CookieStore(self.cookie_file)
+        loaded_cookies.load()
+
+        cookie_store = CookieStore(self.cookie_file)
+
+        # Loaded cookies are kept only for domains of workers which didn't
+        # send their cookies.
+        for cookie in loaded_cookies:
+            index = self._get_cookie_worker_index(cookie)
+
+            if self._workers[index].cookies is None:
+                cookie_store.set_cookie(cookie)
+
+        # Each worker owns the cookies of domains it checks links to.
+        for index, worker in enumerate(self._workers):
+            for cookie in worker.cookies or ():
+                if self._get_cookie_worker_index(cookie) == index:
+                    cookie_store.set_cookie(cookie)
+
+        cookie_store.save()
+
+    async def check_link(
+        self,
+        url: str,
+        probe_method: ProbeMethod | None = None,
+    ) -> LinkCheckResult:
+        index = get_worker_index(URL(url).host or "", self.worker_count)
+        worker = self._workers[index]
+
+        if worker.exited.is_set():
+            message = f"Check worker {index} exited"
+            raise CheckWorkerError(message)
+
+        request_id = next(self._request_ids)
+        future: asyncio.Future[LinkCheckResult] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._pending_checks[request_id] = index, future
+
+        # The priority is passed on to the worker's rate limiters.
+        worker.requests.put(
+            _Request(request_id, url, probe_method, get_request_priority()),
+        )
+
+        try:
+            return await future
+        finally:
+            del self._pending_checks[request_id]
@@ -13,10 +13,13 @@ from bookmarkmgr.types import Failure, Result, Success
 from . import ClientSessionContextManagerMixin
 
 if TYPE_CHECKING:
-    from collections.abc import Mapping
+    from collections.abc import Callable, Mapping
 
 logger = get_logger("bookmarkmgr/AT")
 
+# Requests per minute.
+RATE_LIMIT = 6
+
 
 class ArchiveTodayError(Exception):
     pass
@@ -56,19 +59,30 @@ class ArchiveTodayClient(ClientSessionContextManagerMixin[RateLimitedSession]):
     def __init__(self) -> None:
         self._session = RateLimitedSession(
             rate_limiter=RateLimiter(
-                limit=6,
+                limit=RATE_LIMIT,
             ),
         )
 
-    async def _archive_page(self, url: str) -> Result[str, str]:
+    async def _archive_page(  # noqa: C901
+        self,
+        url: str,
+        job: str | None,
+        on_submitted: Callable[[str], object] | None,
+    ) -> Result[str, str]:
         archival_url = None
-        request_params: _RequestParams = {
-            "url": "https://archive.ph/submit/",
-            "params": {
-                "url": url,
-            },
-        }
-        submitted = False
+        request_params: _RequestParams = (
+            {
+                "url": "https://archive.ph/submit/",
+                "params": {
+                    "url": url,
+                },
+            }
+            if job is None
+            else {
+                "url": job,
+            }
+        )
+        submitted = job is not None
 
         start_delay = 5
         delay_factor = 0
@@ -96,6 +110,9 @@ class ArchiveTodayClient(ClientSessionContextManagerMixin[RateLimitedSession]):
                             submitted = True
 
                             logger.debug("Successfully submitted %s", url)
+
+                            if on_submitted is not None:
+                                on_submitted(refresh_parts[1])
                 case HTTPStatus.FOUND.value:
                     archival_url = response.redirect_url
                     break
@@ -132,10 +149,16 @@ class ArchiveTodayClient(ClientSessionContextManagerMixin[RateLimitedSession]):
 
         return Success(archival_url)
 
-    async def archive_page(self, url: str) -> Result[str, str]:
+    async def archive_page(
+        self,
+        url: str,
+        *,
+        job: str | None = None,
+        on_submitted: Callable[[str], object] | None = None,
+    ) -> Result[str, str]:
         try:
             async with asyncio.timeout(3600):
-                return await self._archive_page(url)
+                return await self._archive_page(url, job, on_submitted)
         except CronetError as error:
             raise ArchiveTodayError(error) from error
         except TimeoutError as error:
@@ -1,17 +1,47 @@
 import asyncio
+import codecs
+from collections import defaultdict, deque
+import csv
+from dataclasses import dataclass, field
+from datetime import datetime
+import itertools
+import json
 import math
-from typing import cast, TYPE_CHECKING, TypedDict
+from typing import cast, NotRequired, override, TYPE_CHECKING, TypedDict
 
 from bookmarkmgr.aiohttp import RateLimitedRetryClientSession
-from bookmarkmgr.asyncio import RateLimiter
+from bookmarkmgr.asyncio import BudgetRateLimiter
+from bookmarkmgr.logging import get_logger
 
 from . import ClientSessionContextManagerMixin
 
 if TYPE_CHECKING:
-    from collections.abc import AsyncIterator, Awaitable
+    from collections.abc import (
+        AsyncGenerator,
+        AsyncIterator,
+        Awaitable,
+        Iterable,
+    )
+    from collections.abc import (
+        Set as AbstractSet,
+    )
+    from pathlib import Path
+    from types import TracebackType
+
+logger = get_logger("bookmarkmgr/Raindrop")
 
 RAINDROPS_PER_PAGE = 50
 
+# ID of the system collection of raindrops not in any collection.
+UNSORTED_COLLECTION_ID = -1
+
+_PREFETCH_PAGES = 4
+_QUEUE_SIZE = _PREFETCH_PAGES * RAINDROPS_PER_PAGE
+
+# Writes are sent in batches at most once per this many seconds.
+_WRITE_BEHIND_DELAY = 1
+_BULK_UPDATE_MAX_IDS = 100
+
 
 class BaseRaindrop(TypedDict):
     cover: str
@@ -27,6 +57,11 @@ class RaindropIn(BaseRaindrop, total=False):
 
 class RaindropOut(BaseRaindrop):
     _id: int
+    title: str
+
+
+class _ListedRaindropOut(RaindropOut):
+    lastUpdate: str
 
 
 class CollectionPage(TypedDict):
@@ -34,7 +69,257 @@ class CollectionPage(TypedDict):
     items: list[RaindropOut]
 
 
-_Queue = asyncio.Queue[RaindropOut | None]
+class _ListedCollectionPage(TypedDict):
+    count: int
+    items: list[_ListedRaindropOut]
+
+
+class _Collection(TypedDict):
+    _id: int
+
+
+class _Collections(TypedDict):
+    items: list[_Collection]
+
+
+class Collection(_Collection):
+    title: str
+    # System collections have no dates.
+    created: NotRequired[str]
+    lastUpdate: NotRequired[str]
+
+
+class _CollectionResponse(TypedDict):
+    item: Collection
+
+
+class _SnapshotData(TypedDict):
+    collection_id: int
+    high_water_mark: str | None
+    items: list[RaindropOut]
+
+
+_Queue = asyncio.Queue[RaindropOut]
+
+
+@dataclass
+class _PendingWrites:
+    tag_additions: defaultdict[int, set[str]] = field(
+        default_factory=lambda: defaultdict(set),
+    )
+    updates: dict[int, RaindropIn] = field(default_factory=dict)
+    waiters: defaultdict[int, list[asyncio.Future[None]]] = field(
+        default_factory=lambda: defaultdict(list),
+    )
+
+
+# Fields of exported raindrops needed for RaindropOut.
+_EXPORT_FIELDS = {"cover", "created", "id", "note", "tags", "title", "url"}
+_EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+# Only these fields of listed raindrops are kept, as the rest, like media and
+# highlights, is never used.
+_LISTED_FIELDS = _ListedRaindropOut.__required_keys__
+
+
+def _check_required_fields(
+    keys: AbstractSet[str],
+    fields: AbstractSet[str],
+) -> None:
+    if missing_fields := fields - keys:
+        message = (
+            f"Missing required fields: {', '.join(sorted(missing_fields))}"
+        )
+        raise ValueError(message)
+
+
+# Pages are validated like by msgspec, so that both decoders fail alike. The
+# whole page is still parsed, so pruning items only saves memory.
+def _decode_collection_page_stdlib(data: bytes) -> _ListedCollectionPage:
+    page = cast("_ListedCollectionPage", json.loads(data))
+    _check_required_fields(
+        page.keys(),
+        _ListedCollectionPage.__required_keys__,
+    )
+
+    items = []
+
+    for item in page["items"]:
+        raindrop = cast("dict[str, object]", item)
+        _check_required_fields(raindrop.keys(), _LISTED_FIELDS)
+        items.append(
+            cast(
+                "_ListedRaindropOut",
+                {key: raindrop[key] for key in _LISTED_FIELDS},
+            ),
+        )
+
+    return {"count": page["count"], "items": items}
+
+
+# msgspec decodes only the fields of the page type, skipping the rest without
+# building objects for them. Its validation errors are value errors too.
+try:
+    import msgspec  # type: ignore[missing-import]
+except ImportError:
+    _decode_collection_page_msgspec = None
+    _decode_collection_page = _decode_collection_page_stdlib
+else:
+    _decode_collection_page_msgspec = msgspec.json.Decoder(
+        _ListedCollectionPage,
+    ).decode
+    _decode_collection_page = _decode_collection_page_msgspec
+
+
+def _parse_last_update(raindrop: RaindropOut) -> datetime:
+    # Only listed raindrops have the time of their last update.
+    return datetime.fromisoformat(
+        cast("_ListedRaindropOut", raindrop)["lastUpdate"],
+    )
+
+
+def _raindrop_from_export(record: dict[str, str]) -> RaindropOut:
+    return {
+        "_id": int(record["id"]),
+        "cover": record["cover"],
+        "created": record["created"],
+        "link": record["url"],
+        "note": record["note"],
+        "tags": [
+            tag for tag in map(str.strip, record["tags"].split(",")) if tag
+        ],
+        "title": record["title"],
+    }
+
+
+def _resolve_waiters(
+    waiters: Iterable[asyncio.Future[None]],
+    error: Exception | None,
+) -> None:
+    for waiter in waiters:
+        if waiter.done():
+            continue
+
+        if error is None:
+            waiter.set_result(None)
+        else:
+            waiter.set_exception(error)
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending_text = ""
+
+    async for chunk in chunks:
+        *lines, pending_text = (pending_text + decoder.decode(chunk)).split(
+            "\n",
+        )
+
+        for line in lines:
+            yield line
+
+    if pending_text := pending_text + decoder.decode(b"", final=True):
+        yield pending_text
+
+
+async def _parse_csv_records(
+    chunks: AsyncIterator[bytes],
+) -> AsyncIterator[dict[str, str]]:
+    header = None
+    record_lines: list[str] = []
+    record_quote_count = 0
+
+    async for line in _iter_lines(chunks):
+        record_lines.append(line)
+        record_quote_count += line.count('"')
+
+        # Quotes are escaped by doubling, so a record with an odd number of
+        # them continues on the next line.
+        if record_quote_count % 2 == 1:
+            continue
+
+        rows = list(csv.reader(["\n".join(record_lines)]))
+        record_lines = []
+        record_quote_count = 0
+
+        for row in filter(None, rows):
+            if header is None:
+                header = row
+            else:
+                yield dict(zip(header, row, strict=False))
+
+
+class CollectionSnapshot:
+    """Local copy of a collection."""
+
+    def __init__(
+        self,
+        path: Path,
+        collection_id: int,
+        *,
+        read_only: bool = False,
+    ) -> None:
+        self.path = path
+        self.collection_id = collection_id
+        # Read-only snapshots are updated in memory only.
+        self.read_only = read_only
+
+        self.high_water_mark: datetime | None = None
+        self.items: dict[int, RaindropOut] = {}
+
+    def load(self) -> None:
+        if not self.path.exists():
+            return
+
+        with self.path.open() as f:
+            data: _SnapshotData = json.load(f)
+
+        # Snapshots saved before titles of raindrops were kept are reloaded.
+        if (
+            data["collection_id"] != self.collection_id
+            or data["high_water_mark"] is None
+            or any("title" not in item for item in data["items"][:1])
+        ):
+            return
+
+        self.high_water_mark = datetime.fromisoformat(data["high_water_mark"])
+        self.items = {item["_id"]: item for item in data["items"]}
+
+    def replace(self, items: Iterable[RaindropOut]) -> None:
+        self.high_water_mark = None
+        self.items = {}
+
+        self.update(items)
+
+    def save(self) -> None:
+        data: _SnapshotData = {
+            "collection_id": self.collection_id,
+            "high_water_mark": (
+                None
+                if self.high_water_mark is None
+                else self.high_water_mark.isoformat()
+            ),
+            "items": list(self.items.values()),
+        }
+
+        temporary_path = self.path.with_name(f".{self.path.name}.tmp")
+
+        with temporary_path.open("w") as f:
+            json.dump(data, f)
+
+        temporary_path.replace(self.path)
+
+    def update(self, items: Iterable[RaindropOut]) -> None:
+        for item in items:
+            self.items[item["_id"]] = item
+
+            last_update = _parse_last_update(item)
+
+            if self.high_water_mark is None or (
+                last_update > self.high_water_mark
+            ):
+                self.high_water_mark = last_update
 
 
 async def _enqueue_items(
@@ -47,12 +332,24 @@ async def _enqueue_items(
 
 async def _generator_from_worker_queue(
     queue: _Queue,
-    worker: Awaitable[object],
-) -> AsyncIterator[RaindropOut]:
-    while (item := await queue.get()) is not None:
-        yield item
+    worker: asyncio.Task[None],
+) -> AsyncGenerator[RaindropOut]:
+    # The queue is shut down by the worker once it's done.
+    try:
+        while True:
+            try:
+                item = await queue.get()
+            except asyncio.QueueShutDown:
+                break
+
+            yield item
+    finally:
+        # The worker would wait for the full queue forever if iteration
+        # stopped early.
+        worker.cancel()
+        await asyncio.wait([worker])
 
-    await worker
+    worker.result()
 
 
 class RaindropClient(
@@ -64,94 +361,410 @@ class RaindropClient(
             headers={
                 "Authorization": f"Bearer {api_key}",
             },
-            rate_limiter=RateLimiter(120),
+            rate_limiter=BudgetRateLimiter(120),
         )
 
-    async def _load_collection_page_items(
+        self._flush_task: asyncio.Task[None] | None = None
+        self._pending_writes = _PendingWrites()
+
+    @override
+    async def __aexit__(
         self,
-        queue: _Queue,
-        collection_id: int,
-        page_number: int,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
     ) -> None:
-        await _enqueue_items(
-            queue,
-            (
-                await self.get_collection_page(
-                    collection_id,
-                    page_number,
+        try:
+            if self._flush_task is not None:
+                await self._flush_task
+        finally:
+            await super().__aexit__(exc_type, exc_value, traceback)
+
+    def _enqueue_write(self, raindrop_id: int) -> asyncio.Future[None]:
+        future = asyncio.get_running_loop().create_future()
+        self._pending_writes.waiters[raindrop_id].append(future)
+
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(
+                self._flush_writes_periodically(),
+                name="Flush-Raindrop-writes",
+            )
+
+        return future
+
+    async def _flush_writes(self) -> None:
+        writes, self._pending_writes = self._pending_writes, _PendingWrites()
+        errors: dict[int, Exception] = {}
+
+        async def send(ids: Iterable[int], request: Awaitable[None]) -> None:
+            try:
+                await request
+            except Exception as error:  # noqa: BLE001
+                errors.update(dict.fromkeys(ids, error))
+
+        async with asyncio.TaskGroup() as task_group:
+            for raindrop_id, raindrop in writes.updates.items():
+                _: asyncio.Task[None] = task_group.create_task(
+                    send(
+                        [raindrop_id],
+                        self._put_raindrop(raindrop_id, raindrop),
+                    ),
                 )
-            )["items"],
+
+        # Tag additions are sent after updates, as updates may replace tags.
+        # Identical additions are sent together.
+        raindrop_ids_by_tags: defaultdict[frozenset[str], list[int]] = (
+            defaultdict(list)
         )
 
-    async def _load_collection_items(
+        for raindrop_id, tags in writes.tag_additions.items():
+            if raindrop_id not in errors:
+                raindrop_ids_by_tags[frozenset(tags)].append(raindrop_id)
+
+        async with asyncio.TaskGroup() as task_group:
+            for tags, raindrop_ids in raindrop_ids_by_tags.items():
+                for batch in itertools.batched(
+                    raindrop_ids,
+                    _BULK_UPDATE_MAX_IDS,
+                    strict=False,
+                ):
+                    _ = task_group.create_task(
+                        send(batch, self._put_raindrops_tags(batch, tags)),
+                    )
+
+        for raindrop_id, waiters in writes.waiters.items():
+            _resolve_waiters(waiters, errors.get(raindrop_id))
+
+    async def _flush_writes_periodically(self) -> None:
+        while self._pending_writes.waiters:
+            await asyncio.sleep(_WRITE_BEHIND_DELAY)
+            await self._flush_writes()
+
+    async def _put_raindrop(
+        self,
+        raindrop_id: int,
+        raindrop: RaindropIn,
+    ) -> None:
+        with BudgetRateLimiter.prioritized():
+            await self._session.put(
+                f"/rest/v1/raindrop/{raindrop_id}",
+                json=raindrop,
+            )
+
+    async def _put_raindrops_tags(
+        self,
+        raindrop_ids: Iterable[int],
+        tags: Iterable[str],
+    ) -> None:
+        # Tags are appended to raindrops by bulk updates. Collection 0 stands
+        # for all collections, so the raindrops may be from any of them.
+        with BudgetRateLimiter.prioritized():
+            await self._session.put(
+                "/rest/v1/raindrops/0",
+                json={
+                    "ids": list(raindrop_ids),
+                    "tags": sorted(tags),
+                },
+            )
+
+    async def _enqueue_collection_items(
         self,
         queue: _Queue,
         collection_id: int,
+        search: str | None = None,
     ) -> None:
-        try:
-            page = await self.get_collection_page(collection_id, 0)
+        page = await self.get_collection_page(
+            collection_id,
+            0,
+            search=search,
+        )
 
-            await _enqueue_items(queue, page["items"])
+        await _enqueue_items(queue, page["items"])
 
-            if page["count"] <= RAINDROPS_PER_PAGE:
-                return
+        page_numbers = iter(
+            range(1, math.ceil(page["count"] / RAINDROPS_PER_PAGE)),
+        )
+        prefetched_pages: deque[asyncio.Task[CollectionPage]] = deque()
 
-            async with asyncio.TaskGroup() as task_group:
-                for page_number in range(
-                    1,
-                    math.ceil(page["count"] / RAINDROPS_PER_PAGE),
+        # Pages are prefetched within a window, so that only a limited number
+        # of them is held in memory while the queue is full.
+        try:
+            while True:
+                for page_number in itertools.islice(
+                    page_numbers,
+                    _PREFETCH_PAGES - len(prefetched_pages),
                 ):
-                    _: asyncio.Task[None] = task_group.create_task(
-                        self._load_collection_page_items(
-                            queue,
-                            collection_id,
-                            page_number,
+                    prefetched_pages.append(
+                        asyncio.create_task(
+                            self.get_collection_page(
+                                collection_id,
+                                page_number,
+                                search=search,
+                            ),
+                            name=f"Gather-collection-page-{page_number}",
                         ),
-                        name=f"Gather-collection-page-{page_number}",
                     )
+
+                if not prefetched_pages:
+                    break
+
+                page = await prefetched_pages.popleft()
+
+                await _enqueue_items(queue, page["items"])
         finally:
-            await queue.put(None)
+            for task in prefetched_pages:
+                task.cancel()
 
-    async def export_collection(self, collection_id: int) -> str:
+            await asyncio.gather(*prefetched_pages, return_exceptions=True)
+
+    async def _enqueue_exported_collection_items(
+        self,
+        queue: _Queue,
+        collection_id: int,
+    ) -> bool:
+        """Return whether the export contained all fields of raindrops."""
+        async with self._session.get(
+            f"/rest/v1/raindrops/{collection_id}/export.csv",
+        ) as response:
+            async for record in _parse_csv_records(
+                response.content.iter_chunked(_EXPORT_CHUNK_SIZE),
+            ):
+                if missing_fields := _EXPORT_FIELDS.difference(record):
+                    logger.warning(
+                        "Export lacks fields %s, loading pages instead",
+                        ", ".join(sorted(missing_fields)),
+                    )
+                    return False
+
+                await queue.put(_raindrop_from_export(record))
+
+        return True
+
+    async def _load_collection_items(
+        self,
+        queue: _Queue,
+        collection_id: int,
+        search: str | None = None,
+    ) -> None:
+        try:
+            await self._enqueue_collection_items(queue, collection_id, search)
+        finally:
+            queue.shutdown()
+
+    async def _load_exported_collection_items(
+        self,
+        queue: _Queue,
+        collection_id: int,
+    ) -> None:
+        try:
+            # Fields are checked on the first record, so no raindrop has been
+            # enqueued when falling back to loading pages.
+            if not await self._enqueue_exported_collection_items(
+                queue,
+                collection_id,
+            ):
+                await self._enqueue_collection_items(queue, collection_id)
+        finally:
+            queue.shutdown()
+
+    async def _load_updated_collection_items(
+        self,
+        queue: _Queue,
+        snapshot: CollectionSnapshot,
+    ) -> None:
+        try:
+            await asyncio.to_thread(snapshot.load)
+
+            if snapshot.high_water_mark is None:
+                logger.info("Collection snapshot is empty, loading all items")
+
+                await self._load_collection_items_into_snapshot(snapshot)
+            else:
+                await self._update_snapshot(
+                    snapshot,
+                    snapshot.high_water_mark,
+                )
+
+            if not snapshot.read_only:
+                await asyncio.to_thread(snapshot.save)
+
+            await _enqueue_items(queue, list(snapshot.items.values()))
+        finally:
+            queue.shutdown()
+
+    async def _load_collection_items_into_snapshot(
+        self,
+        snapshot: CollectionSnapshot,
+    ) -> None:
+        snapshot.replace(
+            [
+                item
+                async for item in self.get_collection_items(
+                    snapshot.collection_id,
+                )
+            ],
+        )
+
+    async def _update_snapshot(
+        self,
+        snapshot: CollectionSnapshot,
+        high_water_mark: datetime,
+    ) -> None:
+        count = 0
+        updated_items: dict[int, RaindropOut] = {}
+
+        for page_number in itertools.count():
+            page = await self.get_collection_page(
+                snapshot.collection_id,
+                page_number,
+                sort="-lastUpdate",
+            )
+            count = page["count"]
+
+            # Raindrops updated at the high-water mark are loaded again, as
+            # not all of them might have been loaded before.
+            page_updated_items = list(
+                itertools.takewhile(
+                    lambda item: _parse_last_update(item) >= high_water_mark,
+                    page["items"],
+                ),
+            )
+            updated_items.update(
+                (item["_id"], item) for item in page_updated_items
+            )
+
+            if len(page_updated_items) < RAINDROPS_PER_PAGE:
+                break
+
+        snapshot.update(updated_items.values())
+
+        logger.info(
+            "Loaded %d updated items of the collection",
+            len(updated_items),
+        )
+
+        # Removed raindrops are not listed, so they are detected only by the
+        # count of raindrops not matching.
+        if len(snapshot.items) != count:
+            logger.info(
+                "Collection snapshot is out of date, reloading all items",
+            )
+
+            await self._load_collection_items_into_snapshot(snapshot)
+
+    async def export_collection(
+        self,
+        collection_id: int,
+    ) -> AsyncIterator[bytes]:
+        """Stream an HTML export of a collection in chunks."""
         async with self._session.get(
             f"/rest/v1/raindrops/{collection_id}/export.html?sort=-created",
         ) as response:
-            return await response.text()
+            async for chunk in response.content.iter_chunked(
+                _EXPORT_CHUNK_SIZE,
+            ):
+                yield chunk
+
+    async def get_collection(self, collection_id: int) -> Collection:
+        if collection_id == UNSORTED_COLLECTION_ID:
+            return {"_id": collection_id, "title": "Unsorted"}
+
+        async with self._session.get(
+            f"/rest/v1/collection/{collection_id}",
+        ) as response:
+            return cast("_CollectionResponse", await response.json())["item"]
+
+    async def get_collection_ids(self) -> list[int]:
+        """Get IDs of all collections, including nested and Unsorted ones."""
+        collection_ids = []
+
+        for path in ["/rest/v1/collections", "/rest/v1/collections/childrens"]:
+            async with self._session.get(path) as response:
+                collections = cast("_Collections", await response.json())
+
+            collection_ids.extend(item["_id"] for item in collections["items"])
+
+        collection_ids.append(UNSORTED_COLLECTION_ID)
+
+        return collection_ids
 
     def get_collection_items(
         self,
         collection_id: int,
-    ) -> AsyncIterator[RaindropOut]:
-        queue = _Queue()
-        worker = asyncio.create_task(
-            self._load_collection_items(queue, collection_id),
-        )
+        *,
+        from_export: bool = False,
+        search: str | None = None,
+        snapshot: CollectionSnapshot | None = None,
+    ) -> AsyncGenerator[RaindropOut]:
+        """Load raindrops of a collection."""
+        if sum([from_export, search is not None, snapshot is not None]) > 1:
+            message = "Only one of export, search and snapshot can be used"
+            raise ValueError(message)
 
-        return _generator_from_worker_queue(queue, worker)
+        queue = _Queue(_QUEUE_SIZE)
+
+        if from_export:
+            worker = self._load_exported_collection_items(queue, collection_id)
+        elif snapshot is not None:
+            worker = self._load_updated_collection_items(queue, snapshot)
+        else:
+            worker = self._load_collection_items(queue, collection_id, search)
+
+        return _generator_from_worker_queue(
+            queue,
+            asyncio.create_task(worker),
+        )
 
     async def get_collection_page(
         self,
         collection_id: int,
         page: int,
+        *,
+        search: str | None = None,
+        sort: str | None = None,
     ) -> CollectionPage:
+        params = {
+            "page": str(page),
+            "perpage": str(RAINDROPS_PER_PAGE),
+        }
+
+        if search is not None:
+            params["search"] = search
+
+        if sort is not None:
+            params["sort"] = sort
+
         async with self._session.get(
-            (
-                f"/rest/v1/raindrops/{collection_id}"
-                f"?page={page}"
-                f"&perpage={RAINDROPS_PER_PAGE}"
-            ),
+            f"/rest/v1/raindrops/{collection_id}",
+            params=params,
         ) as response:
-            return cast(
-                "CollectionPage",
-                await response.json(),
-            )
+            data = await response.read()
+
+        # Pages are decoded outside of the response context, so that the
+        # connection is released sooner.
+        return cast("CollectionPage", _decode_collection_page(data))
+
+    async def add_raindrop_tags(
+        self,
+        raindrop_id: int,
+        tags: Iterable[str],
+    ) -> None:
+        """Add tags to a raindrop once the write is sent."""
+        self._pending_writes.tag_additions[raindrop_id].update(tags)
+
+        await self._enqueue_write(raindrop_id)
 
     async def update_raindrop(
         self,
         raindrop_id: int,
         raindrop: RaindropIn,
     ) -> None:
-        await self._session.put(
-            f"/rest/v1/raindrop/{raindrop_id}",
-            json=raindrop,
-        )
+        """Update a raindrop once the write is sent."""
+        if (
+            pending_update := self._pending_writes.updates.get(raindrop_id)
+        ) is not None:
+            raindrop = {**pending_update, **raindrop}
+
+        self._pending_writes.updates[raindrop_id] = raindrop
+
+        await self._enqueue_write(raindrop_id)
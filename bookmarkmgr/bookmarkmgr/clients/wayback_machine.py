@@ -2,7 +2,7 @@ import asyncio
 from http import HTTPStatus
 import itertools
 import re
-from typing import cast, TypedDict
+from typing import cast, TYPE_CHECKING, TypedDict
 from urllib.parse import urlsplit
 
 from aiohttp import ClientError, ClientResponseError, TCPConnector
@@ -14,8 +14,14 @@ from bookmarkmgr.types import Failure, Result, Success
 
 from . import ClientSessionContextManagerMixin
 
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping
+
 logger = get_logger("bookmarkmgr/WM")
 
+# Requests per minute.
+RATE_LIMIT = 15
+
 # Uncomment relevant errors when suppressing them is desired.
 _IGNORED_ERRORS = {
     "error:gone",
@@ -71,14 +77,16 @@ class WaybackMachineClient(
             # [2]    exit 1     netcat web.archive.org 443
             connector=TCPConnector(limit=20),
             # https://archive.org/details/toomanyrequests_20191110
-            rate_limiter=RateLimiter(15),
+            rate_limiter=RateLimiter(RATE_LIMIT),
             start_timeout=30,
         )
 
-    async def _archive_page(  # noqa: C901, PLR0912
+    async def _submit_page(
         self,
         url: str,
-    ) -> Result[str, str]:
+        request_headers: Mapping[str, str],
+    ) -> str | Success[str]:
+        """Return job ID of submitted archival or an existing archival URL."""
         request_paramaters = {
             "url": url,
         }
@@ -105,9 +113,6 @@ class WaybackMachineClient(
         logger.debug("Requesting archival of %s", url)
 
         job_id_match = None
-        request_headers = {
-            "Accept": "text/html,application/xhtml+xml,application/xml",
-        }
 
         try:
             # https://github.com/internetarchive/wayback-machine-webextension/blob/edebc9aa49c138fd784f94a1f70e47e0eb583dd9/webextension/scripts/background.js#L57
@@ -145,7 +150,27 @@ class WaybackMachineClient(
 
                 return Success(archival_url)
 
-        job_id = job_id_match.group()
+        return job_id_match.group()
+
+    async def _archive_page(
+        self,
+        url: str,
+        job_id: str | None,
+        on_submitted: Callable[[str], object] | None,
+    ) -> Result[str, str]:
+        request_headers = {
+            "Accept": "text/html,application/xhtml+xml,application/xml",
+        }
+
+        if job_id is None:
+            match await self._submit_page(url, request_headers):
+                case Success() as result:
+                    return result
+                case submitted_job_id:
+                    job_id = submitted_job_id
+
+            if on_submitted is not None:
+                on_submitted(job_id)
 
         logger.debug("Archiving in progress for %s", url)
 
@@ -203,10 +228,16 @@ class WaybackMachineClient(
             f"{data['original_url']}",
         )
 
-    async def archive_page(self, url: str) -> Result[str, str]:
+    async def archive_page(
+        self,
+        url: str,
+        *,
+        job: str | None = None,
+        on_submitted: Callable[[str], object] | None = None,
+    ) -> Result[str, str]:
         try:
             async with asyncio.timeout(3600):
-                return await self._archive_page(url)
+                return await self._archive_page(url, job, on_submitted)
         except ClientError as error:
             raise WaybackMachineError(error) from error
         except TimeoutError as error:
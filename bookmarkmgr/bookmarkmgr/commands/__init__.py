@@ -0,0 +1,16 @@
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def get_collection_file_path(
+    path: Path,
+    collection_id: int,
+    collection_ids: list[int],
+) -> Path:
+    """Get path of a file of a collection."""
+    if len(collection_ids) == 1:
+        return path
+
+    return path.with_stem(f"{path.stem}-{collection_id}")
@@ -0,0 +1,182 @@
+from collections import Counter
+from datetime import timedelta
+import math
+from typing import cast, NamedTuple, TYPE_CHECKING
+
+from yarl import URL
+
+from bookmarkmgr.clients import archive_today, wayback_machine
+from bookmarkmgr.cronet import DEFAULT_HOST_RATE_LIMIT
+from bookmarkmgr.journal import Journal
+from bookmarkmgr.utils.link_metadata import metadata_from_note
+
+from .maintain_collection import (
+    is_maintained,
+    load_collection_items,
+    plan_maintenance,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator
+
+    from bookmarkmgr.clients.raindrop import RaindropClient, RaindropOut
+
+    from .maintain_collection import (
+        MaintainCollectionOptions,
+        MaintenancePlan,
+    )
+
+_ARCHIVAL_RATE_LIMIT_PERIOD = 60
+_WORST_HOST_COUNT = 10
+
+
+class _Estimate(NamedTuple):
+    duration: timedelta
+    work: str
+
+
+def _estimate_duration(
+    request_count: int,
+    limit: int,
+    period: float,
+) -> timedelta:
+    # Rate limiters let through a limit of requests per period, so the last
+    # request can't be sent before the last period starts.
+    return timedelta(
+        seconds=max(math.ceil(request_count / limit) - 1, 0) * period,
+    )
+
+
+async def _plan_maintenance(
+    raindrop_client: RaindropClient,
+    collection_ids: list[int],
+    user_options: MaintainCollectionOptions,
+) -> AsyncGenerator[tuple[str, MaintenancePlan]]:
+    journal = (
+        Journal(user_options.journal_file, resume=user_options.resume)
+        if user_options.journal_file is not None
+        else None
+    )
+
+    if journal is not None:
+        journal.read()
+
+    # Snapshots are left as they are, so that planning changes nothing.
+    for collection_id in collection_ids:
+        async with load_collection_items(
+            raindrop_client,
+            collection_id,
+            collection_ids,
+            user_options,
+            read_only_snapshot=True,
+        ) as items:
+            async for item in items:
+                if not is_maintained(item, journal, user_options):
+                    continue
+
+                # Pending updates are sent before maintenance loads raindrops.
+                raindrop = cast(
+                    "RaindropOut",
+                    item | journal.pending_updates.get(item["_id"], {})
+                    if journal is not None
+                    else item,
+                )
+
+                yield (
+                    raindrop["link"],
+                    plan_maintenance(
+                        raindrop["tags"],
+                        metadata_from_note(raindrop["note"]),
+                        user_options,
+                    ),
+                )
+
+
+async def estimate_maintenance(
+    raindrop_client: RaindropClient,
+    collection_ids: list[int],
+    user_options: MaintainCollectionOptions,
+) -> None:
+    """Print a lower bound of the duration of maintenance of collections."""
+    host_rate_limits = {
+        hostname.lower(): (limit, period)
+        for hostname, limit, period, _ in user_options.host_rate_limits
+    }
+    check_counts: Counter[str] = Counter()
+    at_archival_count = 0
+    wm_archival_count = 0
+    raindrop_count = 0
+
+    async for link, plan in _plan_maintenance(
+        raindrop_client,
+        collection_ids,
+        user_options,
+    ):
+        raindrop_count += 1
+
+        if plan.check_due:
+            check_counts[(URL(link).host or "").lower()] += 1
+
+        at_archival_count += plan.at_archival_due
+        wm_archival_count += plan.wm_archival_due
+
+    host_estimates = sorted(
+        (
+            (
+                _estimate_duration(
+                    count,
+                    *host_rate_limits.get(hostname, DEFAULT_HOST_RATE_LIMIT),
+                ),
+                count,
+                hostname,
+            )
+            for hostname, count in check_counts.items()
+        ),
+        reverse=True,
+    )
+
+    estimates = [
+        _Estimate(
+            _estimate_duration(
+                at_archival_count,
+                archive_today.RATE_LIMIT,
+                _ARCHIVAL_RATE_LIMIT_PERIOD,
+            ),
+            "archive.today archivals",
+        ),
+        _Estimate(
+            _estimate_duration(
+                wm_archival_count,
+                wayback_machine.RATE_LIMIT,
+                _ARCHIVAL_RATE_LIMIT_PERIOD,
+            ),
+            "Wayback Machine archivals",
+        ),
+    ]
+
+    if host_estimates:
+        duration, _, hostname = host_estimates[0]
+        estimates.append(_Estimate(duration, f"checks of {hostname}"))
+
+    # Hosts and services are rate-limited independently, so the slowest of
+    # them bounds the duration.
+    estimate = max(estimates)
+
+    print(  # noqa: T201
+        f"Raindrops: {raindrop_count}\n"
+        f"Checks due: {check_counts.total()} on {len(check_counts)} hosts\n"
+        f"archive.today archivals due: {at_archival_count}\n"
+        f"Wayback Machine archivals due: {wm_archival_count}\n"
+        f"Estimated duration: at least {estimate.duration} "
+        f"({estimate.work})",
+    )
+
+    if not host_estimates:
+        return
+
+    print("\nSlowest hosts:")  # noqa: T201
+
+    for duration, count, hostname in host_estimates[:_WORST_HOST_COUNT]:
+        print(  # noqa: T201
+            f"  {hostname}: {count} checks, at least {duration}",
+        )
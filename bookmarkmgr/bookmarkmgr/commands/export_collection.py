@@ -1,11 +1,44 @@
+import asyncio
+import sys
 from typing import TYPE_CHECKING
 
+from bookmarkmgr.export import EXPORT_TERMINATOR, write_export_to_file
+
+from . import get_collection_file_path
+
 if TYPE_CHECKING:
+    from pathlib import Path
+
     from bookmarkmgr.clients.raindrop import RaindropClient
 
 
 async def export_collection(
     raindrop_client: RaindropClient,
-    collection_id: int,
+    collection_ids: list[int],
+    output: Path | None = None,
 ) -> None:
-    print(await raindrop_client.export_collection(collection_id))  # noqa: T201
+    """Export collections in HTML."""
+    if output is not None:
+        async with asyncio.TaskGroup() as task_group:
+            for collection_id in collection_ids:
+                _: asyncio.Task[None] = task_group.create_task(
+                    write_export_to_file(
+                        raindrop_client.export_collection(collection_id),
+                        get_collection_file_path(
+                            output,
+                            collection_id,
+                            collection_ids,
+                        ),
+                    ),
+                    name=f"Export-collection-{collection_id}",
+                )
+
+        return
+
+    for collection_id in collection_ids:
+        async for chunk in raindrop_client.export_collection(collection_id):
+            sys.stdout.buffer.write(chunk)
+
+        sys.stdout.buffer.write(EXPORT_TERMINATOR)
+
+    sys.stdout.buffer.flush()
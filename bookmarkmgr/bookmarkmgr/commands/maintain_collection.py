@@ -1,30 +1,35 @@
 import asyncio
 import contextlib
 from contextlib import AbstractContextManager, asynccontextmanager
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, UTC
+from enum import StrEnum
 from functools import partial
-from typing import NoReturn, TYPE_CHECKING
+from typing import cast, NamedTuple, NoReturn, TYPE_CHECKING
+import zlib
 
 from tqdm import tqdm
 from tqdm.contrib.logging import logging_redirect_tqdm
+from yarl import URL
 
-from bookmarkmgr import cronet, scraper
-from bookmarkmgr.asyncio import ForgivingTaskGroup
+from bookmarkmgr import scraper
+from bookmarkmgr.asyncio import ForgivingTaskGroup, request_priority
 from bookmarkmgr.checks.duplicate_link import (
     DuplicateLinkChecker,
     get_canonical_url,
 )
 from bookmarkmgr.checks.link_status import (
-    check_link_status,
-    get_fixed_url,
+    LinkCheckResult,
     LinkStatus,
+    scrape_and_check,
 )
+from bookmarkmgr.checks.workers import CheckWorkerPool
 from bookmarkmgr.clients.archive_today import (
     ArchiveTodayClient,
     ArchiveTodayError,
 )
 from bookmarkmgr.clients.raindrop import (
+    CollectionSnapshot,
     RaindropClient,
     RaindropIn,
     RaindropOut,
@@ -34,7 +39,10 @@ from bookmarkmgr.clients.wayback_machine import (
     WaybackMachineError,
 )
 from bookmarkmgr.collections import TypedDefaultsDict
+from bookmarkmgr.commands import get_collection_file_path
 from bookmarkmgr.cronet import PerHostnameRateLimitedSession
+from bookmarkmgr.export import BookmarkExport, write_export_to_file
+from bookmarkmgr.journal import Journal
 from bookmarkmgr.logging import get_logger
 from bookmarkmgr.types import Failure, Result, Success
 from bookmarkmgr.utils.link_metadata import (
@@ -45,6 +53,9 @@ from bookmarkmgr.utils.link_metadata import (
 
 if TYPE_CHECKING:
     from collections.abc import AsyncGenerator, Awaitable, Callable
+    from pathlib import Path
+
+    from bookmarkmgr.asyncio import Priority
 
 logger = get_logger()
 
@@ -59,6 +70,31 @@ LINK_STATUS_TAGS = {
     LinkStatus.BLOCKED: "blocked",
 }
 
+CHECK_INTERVAL = timedelta(days=1)
+BROKEN_CHECK_INTERVAL = timedelta(weeks=1)
+
+# Links are checked less often the longer they stay OK. The check interval
+# doubles every this many OK checks in a row, up to a maximum.
+OK_STREAK_STEP = 5
+MAX_CHECK_INTERVAL_DOUBLINGS = 5
+
+# Longer check intervals are shortened by up to this fraction, so that checks
+# of links which became OK at the same time are spread out.
+CHECK_INTERVAL_JITTER = 0.2
+
+type LinkChecker = Callable[
+    [str, scraper.ProbeMethod | None],
+    Awaitable[LinkCheckResult],
+]
+
+
+class PriorityPolicy(StrEnum):
+    """Order in which raindrops wait for checks and archival."""
+
+    NEWEST = "newest"
+    UNSTABLE = "unstable"
+    LEAST_RECENTLY_CHECKED = "least-recently-checked"
+
 
 @dataclass(frozen=True)
 class MaintainCollectionOptions:
@@ -66,6 +102,25 @@ class MaintainCollectionOptions:
     no_archive: bool
     no_archive_broken: bool
     no_checks: bool
+    cookie_file: Path | None
+    probe_hosts: dict[str, scraper.ProbeMethod]
+    journal_file: Path | None
+    resume: bool
+    snapshot_file: Path | None
+    search: str | None
+    load_from_export: bool
+    export_to: Path | None
+    export_index_file: Path | None
+    priority_policies: list[PriorityPolicy]
+    # Index (starting at 1) and count of shards.
+    shard: tuple[int, int] | None
+    # Count of processes checking links, if not checked by this one.
+    workers: int | None
+
+    @property
+    def detects_duplicates(self) -> bool:
+        # Duplicates can be detected only among all raindrops.
+        return not self.no_checks and self.search is None
 
 
 @asynccontextmanager
@@ -112,6 +167,27 @@ async def get_progress_bar(
             await refresh_task
 
 
+@asynccontextmanager
+async def open_link_checker(
+    user_options: MaintainCollectionOptions,
+) -> AsyncGenerator[LinkChecker]:
+    if user_options.workers is None:
+        async with PerHostnameRateLimitedSession(
+            cookie_file=user_options.cookie_file,
+            host_rate_limits=user_options.host_rate_limits,
+        ) as session:
+            yield partial(scrape_and_check, session)
+
+        return
+
+    async with CheckWorkerPool(
+        user_options.workers,
+        cookie_file=user_options.cookie_file,
+        host_rate_limits=user_options.host_rate_limits,
+    ) as pool:
+        yield pool.check_link
+
+
 async def process_archival_result(
     result_awaitable: Awaitable[Result[str, str]],
     raindrop: RaindropIn,
@@ -156,58 +232,214 @@ async def process_archival_result(
     raindrop["tags"] = [*raindrop["tags"], tag]
 
 
+def is_archival_due(
+    service_initials: str,
+    tags: list[str],
+    note_metadata: Metadata,
+    user_options: MaintainCollectionOptions,
+) -> bool:
+    is_link_broken = len({"broken", "possibly-broken"}.intersection(tags)) > 0
+
+    return not (
+        user_options.no_archive
+        or (user_options.no_archive_broken and is_link_broken)
+        or note_metadata.get(f"Archive ({service_initials})")
+        or note_metadata.get(f"Archival Error ({service_initials})")
+    )
+
+
+def get_last_check(note_metadata: Metadata) -> datetime:
+    try:
+        return datetime.fromisoformat(
+            note_metadata.get("Last check", ""),
+        ).replace(tzinfo=UTC)
+    except ValueError:
+        return datetime.fromtimestamp(0, tz=UTC)
+
+
+def get_ok_streak(note_metadata: Metadata) -> int:
+    try:
+        return int(note_metadata.get("OK streak", ""))
+    except ValueError:
+        return 0
+
+
+def get_check_interval(note_metadata: Metadata) -> timedelta:
+    doublings = min(
+        get_ok_streak(note_metadata) // OK_STREAK_STEP,
+        MAX_CHECK_INTERVAL_DOUBLINGS,
+    )
+
+    if doublings == 0:
+        return CHECK_INTERVAL
+
+    # Jitter is derived from the time of the last check, so that it doesn't
+    # change until the next check.
+    jitter = (
+        zlib.crc32(note_metadata.get("Last check", "").encode()) / 2**32
+    ) * CHECK_INTERVAL_JITTER
+
+    return CHECK_INTERVAL * (1 << doublings) * (1 - jitter)
+
+
+def is_check_due(
+    tags: list[str],
+    note_metadata: Metadata,
+    user_options: MaintainCollectionOptions,
+) -> bool:
+    if user_options.no_checks:
+        return False
+
+    last_check = get_last_check(note_metadata)
+    now = datetime.now(tz=UTC)
+
+    return (
+        "broken" not in tags or now > last_check + BROKEN_CHECK_INTERVAL
+    ) and (
+        "blocked" in tags
+        or "possibly-broken" in tags
+        or now > last_check + get_check_interval(note_metadata)
+    )
+
+
+class MaintenancePlan(NamedTuple):
+    check_due: bool
+    at_archival_due: bool
+    wm_archival_due: bool
+
+    @property
+    def has_network_work(self) -> bool:
+        return any(self)
+
+
+def plan_maintenance(
+    tags: list[str],
+    note_metadata: Metadata,
+    user_options: MaintainCollectionOptions,
+) -> MaintenancePlan:
+    """Classify the work due on a raindrop."""
+    return MaintenancePlan(
+        check_due=is_check_due(tags, note_metadata, user_options),
+        at_archival_due=is_archival_due(
+            "AT",
+            tags,
+            note_metadata,
+            user_options,
+        ),
+        wm_archival_due=is_archival_due(
+            "WM",
+            tags,
+            note_metadata,
+            user_options,
+        ),
+    )
+
+
+def get_maintenance_priority(
+    raindrop: RaindropOut,
+    note_metadata: Metadata,
+    policies: list[PriorityPolicy],
+) -> Priority:
+    """Get priority of maintenance of a raindrop."""
+    priority: list[float] = []
+
+    for policy in policies:
+        match policy:
+            case PriorityPolicy.NEWEST:
+                priority.append(
+                    -datetime.fromisoformat(raindrop["created"]).timestamp(),
+                )
+            case PriorityPolicy.UNSTABLE:
+                priority.append(
+                    0
+                    if {"blocked", "possibly-broken"}.intersection(
+                        raindrop["tags"],
+                    )
+                    else 1,
+                )
+            case PriorityPolicy.LEAST_RECENTLY_CHECKED:
+                priority.append(get_last_check(note_metadata).timestamp())
+
+    return tuple(priority)
+
+
+def is_in_shard(link: str, shard: tuple[int, int] | None) -> bool:
+    """Return whether a raindrop is maintained by a shard."""
+    if shard is None:
+        return True
+
+    index, count = shard
+    host = (URL(link).host or "").lower()
+
+    return zlib.crc32(host.encode()) % count == index - 1
+
+
+def get_canonical_url_raindrop(
+    raindrop: RaindropOut,
+    note_metadata: Metadata,
+) -> RaindropOut:
+    return {
+        **raindrop,
+        "link": note_metadata.get("Canonical URL") or raindrop["link"],
+    }
+
+
 def create_archival_tasks(  # noqa: PLR0913, PLR0917
     task_group: asyncio.TaskGroup,
+    raindrop_id: int,
     raindrop: RaindropIn,
     note_metadata: Metadata,
     at_client: ArchiveTodayClient,
     wm_client: WaybackMachineClient,
+    journal: Journal | None,
     user_options: MaintainCollectionOptions,
 ) -> list[asyncio.Task[None]]:
-    is_link_broken = (
-        len(
-            {"broken", "possibly-broken"}.intersection(raindrop["tags"]),
-        )
-        > 0
-    )
     link = raindrop["link"]
     tasks = []
 
-    if not (
-        user_options.no_archive
-        or (user_options.no_archive_broken and is_link_broken)
-        or note_metadata.get("Archive (AT)")
-        or note_metadata.get("Archival Error (AT)")
-    ):
-        tasks.append(
-            task_group.create_task(
-                process_archival_result(
-                    at_client.archive_page(link),
-                    raindrop,
-                    note_metadata,
-                    "AT",
-                    "archive.today",
-                ),
-                name=f"Archive-Today-{link}",
-            ),
-        )
+    for client, service_initials, service_name, task_name in [
+        (at_client, "AT", "archive.today", "Archive-Today"),
+        (wm_client, "WM", "Wayback Machine", "Wayback-Machine"),
+    ]:
+        if not is_archival_due(
+            service_initials,
+            raindrop["tags"],
+            note_metadata,
+            user_options,
+        ):
+            continue
 
-    if not (
-        user_options.no_archive
-        or (user_options.no_archive_broken and is_link_broken)
-        or note_metadata.get("Archive (WM)")
-        or note_metadata.get("Archival Error (WM)")
-    ):
         tasks.append(
             task_group.create_task(
                 process_archival_result(
-                    wm_client.archive_page(link),
+                    client.archive_page(
+                        link,
+                        job=(
+                            journal.archival_job(
+                                raindrop_id,
+                                service_initials,
+                                link,
+                            )
+                            if journal is not None
+                            else None
+                        ),
+                        on_submitted=(
+                            partial(
+                                journal.record_archival_job,
+                                raindrop_id,
+                                service_initials,
+                                link,
+                            )
+                            if journal is not None
+                            else None
+                        ),
+                    ),
                     raindrop,
                     note_metadata,
-                    "WM",
-                    "Wayback Machine",
+                    service_initials,
+                    service_name,
                 ),
-                name=f"Wayback-Machine-{link}",
+                name=f"{task_name}-{link}",
             ),
         )
 
@@ -246,37 +478,8 @@ def add_or_remove_tag(
     raindrop["tags"] = [*raindrop["tags"], tag]
 
 
-async def scrape_and_check(
-    session: cronet.RetrySession,
-    url: str,
-) -> tuple[scraper.Page | None, LinkStatus, str | None, str | None]:
-    scraper_result = await scraper.scrape_page(session, url)
-    link_status, error = check_link_status(scraper_result)
-
-    if isinstance(scraper_result, cronet.RequestError):
-        return None, link_status, error, None
-
-    if (fixed_url := get_fixed_url(scraper_result.response, url)) is None:
-        return scraper_result.page, link_status, error, None
-
-    old_page = scraper_result.page
-
-    scraper_result = await scraper.scrape_page(session, fixed_url)
-    fixed_link_status, fixed_error = check_link_status(scraper_result)
-
-    if (
-        isinstance(scraper_result, scraper.ScrapedData)
-        and fixed_link_status == LinkStatus.OK
-    ):
-        return scraper_result.page, fixed_link_status, fixed_error, fixed_url
-
-    return old_page, link_status, error, None
-
-
 async def process_scrape_and_check_result(  # noqa: C901, PLR0912
-    result_awaitable: Awaitable[
-        tuple[scraper.Page | None, LinkStatus, str | None, str | None]
-    ],
+    result_awaitable: Awaitable[LinkCheckResult],
     raindrop: RaindropIn,
     metadata: Metadata,
     archival_tasks: list[asyncio.Task[None]],
@@ -332,6 +535,13 @@ async def process_scrape_and_check_result(  # noqa: C901, PLR0912
     else:
         metadata.pop("Broken since", None)
 
+    # Any other status resets the streak, so that the link is checked daily
+    # again.
+    if link_status == LinkStatus.OK:
+        metadata["OK streak"] = str(get_ok_streak(metadata) + 1)
+    else:
+        metadata.pop("OK streak", None)
+
     for status, tag in LINK_STATUS_TAGS.items():
         add_or_remove_tag(
             raindrop,
@@ -379,46 +589,36 @@ def create_raindrop_maintenance_tasks(  # noqa: PLR0913, PLR0917
     note_metadata: Metadata,
     at_client: ArchiveTodayClient,
     wm_client: WaybackMachineClient,
-    check_session: cronet.RetrySession,
+    check_link: LinkChecker,
     duplicate_checker: DuplicateLinkChecker,
+    journal: Journal | None,
     user_options: MaintainCollectionOptions,
 ) -> None:
     raindrop = raindrop_with_defauls.to_typeddict()
 
     create_archival_tasks_partial = partial(
         create_archival_tasks,
+        raindrop_id=raindrop_with_defauls.defaults["_id"],
         raindrop=raindrop,
         note_metadata=note_metadata,
         at_client=at_client,
         wm_client=wm_client,
+        journal=journal,
         user_options=user_options,
     )
     link = raindrop["link"]
 
-    try:
-        last_check = datetime.fromisoformat(
-            note_metadata.get("Last check", ""),
-        ).replace(tzinfo=UTC)
-    except ValueError:
-        last_check = datetime.fromtimestamp(0, tz=UTC)
-
     archival_tasks = create_archival_tasks_partial(task_group)
 
-    if (
-        not user_options.no_checks
-        and (
-            "broken" not in raindrop["tags"]
-            or datetime.now(tz=UTC) > last_check + timedelta(weeks=1)
-        )
-        and (
-            "blocked" in raindrop["tags"]
-            or "possibly-broken" in raindrop["tags"]
-            or datetime.now(tz=UTC) > last_check + timedelta(days=1)
-        )
-    ):
+    if is_check_due(raindrop["tags"], note_metadata, user_options):
         _: asyncio.Task[None] = task_group.create_task(
             process_scrape_and_check_result(
-                scrape_and_check(check_session, link),
+                check_link(
+                    link,
+                    user_options.probe_hosts.get(
+                        (URL(link).host or "").lower(),
+                    ),
+                ),
                 raindrop,
                 note_metadata,
                 archival_tasks,
@@ -427,13 +627,13 @@ def create_raindrop_maintenance_tasks(  # noqa: PLR0913, PLR0917
             name=f"Scrape-And-Check-{link}",
         )
 
-    if not user_options.no_checks:
-        canonical_url_raindrop: RaindropOut = {
-            **raindrop_with_defauls.defaults,
-            "link": note_metadata.get("Canonical URL") or link,
-        }
-
-        duplicate_checker.add_link(canonical_url_raindrop)
+    # The link was added to the duplicate checker when the raindrop was
+    # loaded.
+    if user_options.detects_duplicates:
+        canonical_url_raindrop = get_canonical_url_raindrop(
+            raindrop_with_defauls.defaults,
+            note_metadata,
+        )
 
         _ = task_group.create_task(
             process_check_duplicate_result(
@@ -446,14 +646,94 @@ def create_raindrop_maintenance_tasks(  # noqa: PLR0913, PLR0917
         )
 
 
+async def send_raindrop_update(  # noqa: PLR0913
+    raindrop_client: RaindropClient,
+    raindrop_id: int,
+    raindrop: RaindropIn,
+    journal: Journal | None,
+    *,
+    completed: bool = True,
+    export: BookmarkExport | None = None,
+    original_tags: list[str],
+) -> None:
+    if journal is not None:
+        journal.record_update(raindrop_id, raindrop, completed=completed)
+
+    if not raindrop:
+        return
+
+    sent_raindrop = raindrop
+
+    # Additions of tags can be sent in bulk with the same additions to other
+    # raindrops, while any other changes are sent in an update.
+    if "tags" in raindrop and set(original_tags) < set(raindrop["tags"]):
+        added_tags = sorted(set(raindrop["tags"]).difference(original_tags))
+        update = cast(
+            "RaindropIn",
+            {key: value for key, value in raindrop.items() if key != "tags"},
+        )
+        # Raindrop appends tags added in bulk.
+        sent_raindrop = raindrop.copy()
+        sent_raindrop["tags"] = [*original_tags, *added_tags]
+
+        # Both writes are enqueued before either is sent.
+        await asyncio.gather(
+            raindrop_client.add_raindrop_tags(raindrop_id, added_tags),
+            *(
+                [raindrop_client.update_raindrop(raindrop_id, update)]
+                if update
+                else []
+            ),
+        )
+    else:
+        await raindrop_client.update_raindrop(raindrop_id, raindrop)
+
+    # Only updates known to Raindrop are exported.
+    if export is not None:
+        export.update(raindrop_id, sent_raindrop)
+
+    if journal is not None:
+        journal.record_sent(raindrop_id)
+
+
+async def send_pending_update(
+    raindrop_client: RaindropClient,
+    raindrop_id: int,
+    raindrop: RaindropIn,
+    journal: Journal,
+) -> None:
+    await raindrop_client.update_raindrop(raindrop_id, raindrop)
+
+    journal.record_sent(raindrop_id)
+
+
+async def send_pending_updates(
+    raindrop_client: RaindropClient,
+    journal: Journal,
+) -> None:
+    async with ForgivingTaskGroup() as task_group:
+        for raindrop_id, raindrop in list(journal.pending_updates.items()):
+            _: asyncio.Task[None] = task_group.create_task(
+                send_pending_update(
+                    raindrop_client,
+                    raindrop_id,
+                    raindrop,
+                    journal,
+                ),
+                name=f"Send-Pending-Update-{raindrop_id}",
+            )
+
+
 async def maintain_raindrop(  # noqa: PLR0913, PLR0917
     raindrop_client: RaindropClient,
     raindrop: RaindropOut,
     at_client: ArchiveTodayClient,
     wm_client: WaybackMachineClient,
-    check_session: cronet.RetrySession,
+    check_link: LinkChecker,
     duplicate_checker: DuplicateLinkChecker,
     user_options: MaintainCollectionOptions,
+    journal: Journal | None = None,
+    export: BookmarkExport | None = None,
 ) -> None:
     note_metadata = metadata_from_note(raindrop["note"])
     task_group_error = None
@@ -469,8 +749,9 @@ async def maintain_raindrop(  # noqa: PLR0913, PLR0917
                 note_metadata,
                 at_client,
                 wm_client,
-                check_session,
+                check_link,
                 duplicate_checker,
+                journal,
                 user_options,
             )
     except ExceptionGroup as error:
@@ -482,75 +763,343 @@ async def maintain_raindrop(  # noqa: PLR0913, PLR0917
         if raindrop["note"] != (new_note := metadata_to_note(note_metadata)):
             updated_raindrop["note"] = new_note
 
-        if updated_raindrop["tags"] != (
-            sorted_tags := sorted(updated_raindrop["tags"])
-        ):
-            updated_raindrop["tags"] = sorted_tags
-
-        if not updated_raindrop_with_defauls:
-            return
+        # Tags are sorted only when they change, as Raindrop appends tags
+        # added in bulk, and their order alone isn't worth an update.
+        if set(updated_raindrop["tags"]) != set(raindrop["tags"]):
+            updated_raindrop["tags"] = sorted(updated_raindrop["tags"])
 
-        await raindrop_client.update_raindrop(
+        await send_raindrop_update(
+            raindrop_client,
             raindrop["_id"],
             updated_raindrop_with_defauls.data,
+            journal,
+            completed=task_group_error is None,
+            export=export,
+            original_tags=raindrop["tags"],
         )
     finally:
         if task_group_error is not None:
             raise task_group_error
 
 
-async def maintain_collection(
+class _DuplicateStatusItem(NamedTuple):
+    raindrop: RaindropOut
+    canonical_url_raindrop: RaindropOut
+
+
+def is_maintained(
+    raindrop: RaindropOut,
+    journal: Journal | None,
+    user_options: MaintainCollectionOptions,
+) -> bool:
+    # Raindrops completed by an interrupted run or of other shards aren't
+    # maintained.
+    return (
+        journal is None or raindrop["_id"] not in journal.completed
+    ) and is_in_shard(raindrop["link"], user_options.shard)
+
+
+def load_collection_items(
     raindrop_client: RaindropClient,
     collection_id: int,
+    collection_ids: list[int],
     user_options: MaintainCollectionOptions,
+    *,
+    read_only_snapshot: bool = False,
+) -> contextlib.aclosing[AsyncGenerator[RaindropOut]]:
+    return contextlib.aclosing(
+        raindrop_client.get_collection_items(
+            collection_id,
+            from_export=user_options.load_from_export,
+            search=user_options.search,
+            snapshot=(
+                CollectionSnapshot(
+                    get_collection_file_path(
+                        user_options.snapshot_file,
+                        collection_id,
+                        collection_ids,
+                    ),
+                    collection_id,
+                    read_only=read_only_snapshot,
+                )
+                if user_options.snapshot_file is not None
+                else None
+            ),
+        ),
+    )
+
+
+@dataclass(frozen=True)
+class _MaintenanceContext:
+    raindrop_client: RaindropClient
+    at_client: ArchiveTodayClient
+    wm_client: WaybackMachineClient
+    check_link: LinkChecker
+    duplicate_checker: DuplicateLinkChecker
+    journal: Journal | None
+    export: BookmarkExport | None
+    task_group: asyncio.TaskGroup
+    loading_progress_bar: tqdm[NoReturn]
+    maintaining_progress_bar: tqdm[NoReturn]
+    user_options: MaintainCollectionOptions
+    duplicate_status_items: list[_DuplicateStatusItem] = field(
+        default_factory=list,
+    )
+
+    def on_task_done(
+        self,
+        task: asyncio.Task[object],  # noqa: ARG002
+    ) -> None:
+        self.maintaining_progress_bar.update(1)
+
+
+def create_item_maintenance_task(
+    item: RaindropOut,
+    context: _MaintenanceContext,
 ) -> None:
-    items = raindrop_client.get_collection_items(collection_id)
+    duplicate_checker = context.duplicate_checker
+    journal = context.journal
+    user_options = context.user_options
+
+    note_metadata = metadata_from_note(item["note"])
+    canonical_url_raindrop = get_canonical_url_raindrop(item, note_metadata)
+
+    # Links are added as raindrops are loaded, before any of their tasks run,
+    # so that all of them are added once loading finishes.
+    if user_options.detects_duplicates:
+        duplicate_checker.add_link(canonical_url_raindrop)
+
+    # Other raindrops are only needed to detect duplicates.
+    if not is_maintained(item, journal, user_options):
+        context.maintaining_progress_bar.update(1)
+        return
+
+    if plan_maintenance(
+        item["tags"],
+        note_metadata,
+        user_options,
+    ).has_network_work:
+        # Checks and archival requests of raindrops loaded later overtake
+        # those of raindrops with a lower priority waiting for rate limiters.
+        with request_priority(
+            get_maintenance_priority(
+                item,
+                note_metadata,
+                user_options.priority_policies,
+            ),
+        ):
+            task = context.task_group.create_task(
+                maintain_raindrop(
+                    context.raindrop_client,
+                    item,
+                    context.at_client,
+                    context.wm_client,
+                    context.check_link,
+                    duplicate_checker,
+                    user_options,
+                    journal,
+                    context.export,
+                ),
+                name=f"Maintain-{item['link']}",
+            )
+
+        task.add_done_callback(context.on_task_done)
+        return
 
+    if not user_options.detects_duplicates:
+        context.maintaining_progress_bar.update(1)
+        return
+
+    # Duplicate statuses are resolved in bulk once all raindrops are loaded.
+    context.duplicate_status_items.append(
+        _DuplicateStatusItem(
+            item,
+            canonical_url_raindrop,
+        ),
+    )
+
+
+async def resolve_duplicate_statuses(context: _MaintenanceContext) -> None:
+    """Refresh duplicate statuses of raindrops without network work due."""
+    for item in context.duplicate_status_items:
+        raindrop = item.raindrop
+        updated_raindrop_with_defauls = TypedDefaultsDict[
+            RaindropIn,
+            RaindropOut,
+        ](raindrop)
+        updated_raindrop = updated_raindrop_with_defauls.to_typeddict()
+
+        add_or_remove_tag(
+            updated_raindrop,
+            context.duplicate_checker.is_duplicate(
+                item.canonical_url_raindrop,
+            ),
+            "duplicate",
+        )
+
+        # Tags are sorted only when they change, as Raindrop appends tags
+        # added in bulk, and their order alone isn't worth an update.
+        if set(updated_raindrop["tags"]) != set(raindrop["tags"]):
+            updated_raindrop["tags"] = sorted(updated_raindrop["tags"])
+
+        # Unchanged raindrops aren't journaled, as they're only planned again
+        # when resuming.
+        if not updated_raindrop_with_defauls:
+            context.maintaining_progress_bar.update(1)
+            continue
+
+        task = context.task_group.create_task(
+            send_raindrop_update(
+                context.raindrop_client,
+                raindrop["_id"],
+                updated_raindrop_with_defauls.data,
+                context.journal,
+                export=context.export,
+                original_tags=raindrop["tags"],
+            ),
+            name=f"Update-Duplicate-Status-{raindrop['link']}",
+        )
+        task.add_done_callback(context.on_task_done)
+
+    context.duplicate_status_items.clear()
+
+
+async def maintain_collection_items(
+    collection_id: int,
+    collection_ids: list[int],
+    context: _MaintenanceContext,
+) -> None:
+    user_options = context.user_options
+
+    # The loading is stopped if maintenance of the collection fails.
+    async with load_collection_items(
+        context.raindrop_client,
+        collection_id,
+        collection_ids,
+        user_options,
+    ) as items:
+        async for item in items:
+            context.loading_progress_bar.update(1)
+
+            if context.export is not None:
+                context.export.add(collection_id, item)
+
+            create_item_maintenance_task(item, context)
+
+            await asyncio.sleep(0)
+
+
+async def write_collection_export(  # noqa: PLR0913, PLR0917
+    raindrop_client: RaindropClient,
+    export: BookmarkExport,
+    collection_id: int,
+    collection_ids: list[int],
+    path: Path,
+    index_path: Path | None,
+) -> None:
+    path = get_collection_file_path(path, collection_id, collection_ids)
+    # The collection is loaded once raindrops are updated, so that the time
+    # of its last update is current.
+    collection = await raindrop_client.get_collection(collection_id)
+
+    if index_path is None:
+        await write_export_to_file(export.render(collection), path)
+    else:
+        await export.write_indexed(
+            collection,
+            path,
+            get_collection_file_path(
+                index_path,
+                collection_id,
+                collection_ids,
+            ),
+        )
+
+
+async def maintain_collection(
+    raindrop_client: RaindropClient,
+    collection_ids: list[int],
+    user_options: MaintainCollectionOptions,
+) -> None:
+    """Maintain raindrops of collections."""
     duplicate_checker = DuplicateLinkChecker()
+    export = BookmarkExport() if user_options.export_to is not None else None
+    journal_context: AbstractContextManager[Journal | None] = (
+        Journal(user_options.journal_file, resume=user_options.resume)
+        if user_options.journal_file is not None
+        else contextlib.nullcontext()
+    )
 
     async with (
         as_async(logging_redirect_tqdm()),
+        as_async(journal_context) as journal,
         get_progress_bar(
             "Maintaining",
         ) as maintaining_progress_bar,
         ArchiveTodayClient() as at_client,
         WaybackMachineClient() as wm_client,
-        PerHostnameRateLimitedSession(
-            host_rate_limits=user_options.host_rate_limits,
-        ) as check_session,
+        open_link_checker(user_options) as check_link,
         ForgivingTaskGroup() as task_group,
         get_progress_bar(
             "  Loading",
             leave=False,
         ) as loading_progress_bar,
     ):
+        if journal is not None:
+            # Pending updates are sent before loading raindrops, so that the
+            # loaded raindrops are up to date.
+            await send_pending_updates(raindrop_client, journal)
+
+        context = _MaintenanceContext(
+            raindrop_client,
+            at_client,
+            wm_client,
+            check_link,
+            duplicate_checker,
+            journal,
+            export,
+            task_group,
+            loading_progress_bar,
+            maintaining_progress_bar,
+            user_options,
+        )
 
-        def on_task_done(
-            task: asyncio.Task[object],  # noqa: ARG001
-        ) -> None:
-            maintaining_progress_bar.update(1)
-
-        async for item in items:
-            loading_progress_bar.update(1)
-
-            task = task_group.create_task(
-                maintain_raindrop(
-                    raindrop_client,
-                    item,
-                    at_client,
-                    wm_client,
-                    check_session,
-                    duplicate_checker,
-                    user_options,
-                ),
-                name=f"Maintain-{item['link']}",
-            )
-            task.add_done_callback(on_task_done)
-
-            await asyncio.sleep(0)
+        # A failure to load any collection is fatal, as duplicates couldn't
+        # be detected without all raindrops.
+        async with asyncio.TaskGroup() as loading_task_group:
+            for collection_id in collection_ids:
+                _: asyncio.Task[None] = loading_task_group.create_task(
+                    maintain_collection_items(
+                        collection_id,
+                        collection_ids,
+                        context,
+                    ),
+                    name=f"Load-collection-{collection_id}",
+                )
 
         maintaining_progress_bar.total = loading_progress_bar.n
 
         duplicate_checker.set_required_link_count(
             maintaining_progress_bar.total,
         )
+
+        await resolve_duplicate_statuses(context)
+
+    # The export is rendered once all updates have been sent, so that it's
+    # consistent with the collections.
+    if export is not None and user_options.export_to is not None:
+        export_to = user_options.export_to
+
+        async with asyncio.TaskGroup() as export_task_group:
+            for collection_id in collection_ids:
+                _ = export_task_group.create_task(
+                    write_collection_export(
+                        raindrop_client,
+                        export,
+                        collection_id,
+                        collection_ids,
+                        export_to,
+                        user_options.export_index_file,
+                    ),
+                    name=f"Export-collection-{collection_id}",
+                )
@@ -1,6 +1,7 @@
 from .errors import Error, RequestError
 from .models import Response, ResponseStatus
 from .session import (
+    DEFAULT_HOST_RATE_LIMIT,
     PerHostnameRateLimitedSession,
     RateLimitedSession,
     RetrySession,
@@ -8,6 +9,7 @@ from .session import (
 )
 
 __all__ = (
+    "DEFAULT_HOST_RATE_LIMIT",
     "Error",
     "PerHostnameRateLimitedSession",
     "RateLimitedSession",
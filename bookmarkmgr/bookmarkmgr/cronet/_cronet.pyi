@@ -1,5 +1,5 @@
 from collections.abc import Callable
-from typing import Any, Literal, NewType, ParamSpec, TypeVar
+from typing import Any, Literal, NewType, overload, ParamSpec, TypeVar
 
 from .types import (
     Buffer,
@@ -12,6 +12,7 @@ from .types import (
     Result,
     Runnable,
     String,
+    StringArray,
     UrlRequest,
     UrlRequestCallback,
     UrlRequestParams,
@@ -53,25 +54,66 @@ type _UrlRequestCallback_OnSucceededFunc = Callable[
 
 _Handle = NewType("_Handle", object)
 
+class RequestContext:
+    handle: _Handle
+    max_body_size: int
+    body: RawData
+    body_size: int
+    body_capacity: int
+    result: Result
+    out_of_memory: bool
+    skip_body: bool
+
 # ruff: noqa: N802
 
 class _FFI:
+    @overload
     def cast(self, c_type: Literal["char*"], value: object) -> String: ...
+    @overload
+    def cast(
+        self,
+        c_type: Literal["_RequestContext *"],
+        value: object,
+    ) -> RequestContext: ...
     def def_extern(self) -> Callable[[Callable[_P, _R]], Callable[_P, _R]]: ...
     def from_handle(self, handle: _Handle) -> Any: ...  # type: ignore[explicit-any]
+    @overload
+    def new(self, c_type: Literal["_RequestContext *"]) -> RequestContext: ...
+    @overload
+    def new(self, c_type: Literal["char[]"], init: bytes) -> String: ...
+    @overload
+    def new(
+        self,
+        c_type: Literal["char *[]"],
+        init: list[String],
+    ) -> StringArray: ...
     def new_handle(self, obj: object) -> _Handle: ...
     def string(self, cdata: String, maxlen: int = ...) -> bytes: ...
+    def unpack(self, cdata: RawData, length: int) -> bytes: ...
 
 class _Lib:
     _executor_execute: _Executor_Execute
 
     _on_request_canceled: _UrlRequestCallback_OnCanceledFunc
     _on_request_failed: _UrlRequestCallback_OnFailedFunc
-    _on_request_read_completed: _UrlRequestCallback_OnReadCompletedFunc
     _on_request_redirect_received: _UrlRequestCallback_OnRedirectReceivedFunc
     _on_request_response_started: _UrlRequestCallback_OnResponseStartedFunc
     _on_request_succeeded: _UrlRequestCallback_OnSucceededFunc
 
+    def _direct_executor_create(self) -> Executor: ...
+    def _request_context_release_body(
+        self,
+        context: RequestContext,
+    ) -> None: ...
+    def _url_request_callback_create(self) -> UrlRequestCallback: ...
+    def _url_request_params_add_headers(
+        self,
+        params: UrlRequestParams,
+        names: StringArray,
+        values: StringArray,
+        count: int,
+    ) -> None: ...
+
     Cronet_RESULT_SUCCESS: Result
 
     def Cronet_Buffer_Create(self) -> Buffer: ...
@@ -180,13 +222,18 @@ class _Lib:
     def Cronet_UrlRequestCallback_SetClientContext(
         self,
         callback: UrlRequestCallback,
-        context: _Handle,
+        context: RequestContext,
     ) -> None: ...
     def Cronet_UrlRequestParams_Create(self) -> UrlRequestParams: ...
     def Cronet_UrlRequestParams_Destroy(
         self,
         params: UrlRequestParams,
     ) -> None: ...
+    def Cronet_UrlRequestParams_allow_direct_executor_set(
+        self,
+        params: UrlRequestParams,
+        allow: bool,
+    ) -> None: ...
     def Cronet_UrlRequestParams_http_method_set(
         self,
         params: UrlRequestParams,
@@ -0,0 +1,258 @@
+from email.utils import parsedate_to_datetime
+from http.cookiejar import Cookie, LoadError, MozillaCookieJar
+from ipaddress import ip_address
+import time
+from typing import TYPE_CHECKING
+
+from .logging import logger
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from pathlib import Path
+
+    from yarl import URL
+
+type _CookieKey = tuple[str, str]
+
+
+def _default_path(url: URL) -> str:
+    path = url.path
+
+    if not path.startswith("/") or path.count("/") == 1:
+        return "/"
+
+    return path[: path.rindex("/")]
+
+
+def _domain_key(domain: str) -> str:
+    return domain.lstrip(".").lower()
+
+
+def _is_ip_address(host: str) -> bool:
+    try:
+        ip_address(host)
+    except ValueError:
+        return False
+
+    return True
+
+
+def _domain_matches(host: str, domain: str) -> bool:
+    return host == domain or (
+        host.endswith(f".{domain}") and not _is_ip_address(host)
+    )
+
+
+def _path_matches(request_path: str, cookie_path: str) -> bool:
+    return request_path == cookie_path or (
+        request_path.startswith(cookie_path)
+        and (
+            cookie_path.endswith("/") or request_path[len(cookie_path)] == "/"
+        )
+    )
+
+
+def _host_domains(host: str) -> Iterator[str]:
+    yield host
+
+    if _is_ip_address(host):
+        return
+
+    while "." in host:
+        host = host.split(".", 1)[1]
+        yield host
+
+
+class CookieStore:
+    """Cookie jar indexed by domain."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path
+
+        self._cookies: dict[str, dict[_CookieKey, Cookie]] = {}
+
+    def __iter__(self) -> Iterator[Cookie]:
+        for cookies in self._cookies.values():
+            yield from cookies.values()
+
+    def __len__(self) -> int:
+        return sum(len(cookies) for cookies in self._cookies.values())
+
+    def _parse_set_cookie(  # noqa: C901
+        self,
+        url: URL,
+        header: str,
+        now: int,
+    ) -> Cookie | None:
+        pair, *attributes = header.split(";")
+        name, separator, value = pair.partition("=")
+
+        if not separator or not (name := name.strip()):
+            return None
+
+        host = (url.host or "").lower()
+        domain = host
+        domain_specified = False
+        expires = None
+        path = None
+        secure = False
+
+        for attribute in attributes:
+            key, _, attribute_value = attribute.partition("=")
+            attribute_value = attribute_value.strip()
+
+            match key.strip().lower():
+                case "domain" if attribute_value:
+                    domain = _domain_key(attribute_value)
+                    domain_specified = True
+                case "expires" if expires is None:
+                    try:
+                        expires = int(
+                            parsedate_to_datetime(attribute_value).timestamp(),
+                        )
+                    except TypeError, ValueError:
+                        continue
+                case "max-age":
+                    try:
+                        expires = now + int(attribute_value)
+                    except ValueError:
+                        continue
+                case "path" if attribute_value.startswith("/"):
+                    path = attribute_value
+                case "secure":
+                    secure = True
+                case _:
+                    pass
+
+        if domain_specified and (
+            "." not in domain or not _domain_matches(host, domain)
+        ):
+            logger.debug("Rejecting cookie %s for %s", name, domain)
+            return None
+
+        return Cookie(
+            version=0,
+            name=name,
+            value=value.strip(),
+            port=None,
+            port_specified=False,
+            domain=f".{domain}" if domain_specified else domain,
+            domain_specified=domain_specified,
+            domain_initial_dot=domain_specified,
+            path=path or _default_path(url),
+            path_specified=path is not None,
+            secure=secure,
+            expires=expires,
+            discard=expires is None,
+            comment=None,
+            comment_url=None,
+            rest={},
+        )
+
+    def clear_expired_cookies(self) -> None:
+        now = int(time.time())
+
+        for domain, cookies in list(self._cookies.items()):
+            for key, cookie in list(cookies.items()):
+                if cookie.is_expired(now):
+                    del cookies[key]
+
+            if not cookies:
+                del self._cookies[domain]
+
+    def cookie_header(self, url: URL) -> str | None:
+        if url.host is None:
+            return None
+
+        host = url.host.lower()
+        is_secure = url.scheme == "https"
+        now = int(time.time())
+        path = url.path or "/"
+        matching_cookies = []
+
+        for domain in _host_domains(host):
+            if (cookies := self._cookies.get(domain)) is None:
+                continue
+
+            for key, cookie in list(cookies.items()):
+                if cookie.is_expired(now):
+                    del cookies[key]
+                    continue
+
+                if (
+                    (not cookie.domain_specified and domain != host)
+                    or (cookie.secure and not is_secure)
+                    or not _path_matches(path, cookie.path)
+                ):
+                    continue
+
+                matching_cookies.append(cookie)
+
+        if not matching_cookies:
+            return None
+
+        matching_cookies.sort(key=lambda c: len(c.path), reverse=True)
+
+        return "; ".join(
+            f"{cookie.name}={cookie.value}"
+            if cookie.value is not None
+            else cookie.name
+            for cookie in matching_cookies
+        )
+
+    def extract_cookies(self, url: URL, headers: Iterable[str]) -> None:
+        now = int(time.time())
+
+        for header in headers:
+            if (cookie := self._parse_set_cookie(url, header, now)) is None:
+                continue
+
+            if cookie.is_expired(now):
+                self._cookies.get(_domain_key(cookie.domain), {}).pop(
+                    (cookie.path, cookie.name),
+                    None,
+                )
+                continue
+
+            self.set_cookie(cookie)
+
+    def load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+
+        jar = MozillaCookieJar(self.path)
+
+        try:
+            jar.load()
+        except LoadError as error:
+            logger.warning("Failed to load cookies: %s", error)
+            return
+
+        for cookie in jar:
+            self.set_cookie(cookie)
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+
+        self.clear_expired_cookies()
+
+        jar = MozillaCookieJar()
+
+        for cookie in self:
+            # The format marks cookies applying to subdomains by a leading
+            # dot.
+            if cookie.domain_specified and not cookie.domain.startswith("."):
+                cookie.domain = f".{cookie.domain}"
+
+            jar.set_cookie(cookie)
+
+        temporary_path = self.path.with_name(f".{self.path.name}.tmp")
+        jar.save(str(temporary_path))
+        temporary_path.replace(self.path)
+
+    def set_cookie(self, cookie: Cookie) -> None:
+        self._cookies.setdefault(_domain_key(cookie.domain), {})[
+            cookie.path,
+            cookie.name,
+        ] = cookie
@@ -0,0 +1,41 @@
+from typing import TYPE_CHECKING
+
+from ._cronet import ffi, lib
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from .types import String, UrlRequestParams
+
+
+class PreparedHeaders:
+    """Request headers encoded once and applied with a single FFI call."""
+
+    def __init__(self, headers: Iterable[tuple[str, str]]) -> None:
+        names: list[String] = []
+        values: list[String] = []
+
+        for name, value in headers:
+            names.append(ffi.new("char[]", name.encode()))
+            values.append(ffi.new("char[]", value.encode()))
+
+        # Pointer arrays don't own the strings, so references to them must be
+        # kept for as long as the arrays are used.
+        self._strings = (names, values)
+        self._names = ffi.new("char *[]", names)
+        self._values = ffi.new("char *[]", values)
+        self._count = len(names)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add_to(self, params: UrlRequestParams) -> None:
+        if not self._count:
+            return
+
+        lib._url_request_params_add_headers(  # noqa: SLF001
+            params,
+            self._names,
+            self._values,
+            self._count,
+        )
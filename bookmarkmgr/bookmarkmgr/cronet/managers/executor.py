@@ -23,7 +23,8 @@ def _executor_execute(executor: Executor, runnable: Runnable) -> None:
 class ExecutorManager:
     _processing_allowed: bool
 
-    def __init__(self) -> None:
+    def __init__(self, *, direct: bool = False) -> None:
+        self._direct = direct
         self._handle = ffi.new_handle(self)
         self._queue: Queue[Runnable | None] = Queue()
         self._worker: Awaitable[None] | None = None
@@ -31,14 +32,22 @@ class ExecutorManager:
 
     async def __aenter__(self) -> Self:
         if self._executor is None:
-            self._executor = lib.Cronet_Executor_CreateWith(
-                lib._executor_execute,  # noqa: SLF001
-            )
-            lib.Cronet_Executor_SetClientContext(self._executor, self._handle)
+            if self._direct:
+                # Runnables are run on the calling thread without entering
+                # Python.
+                self._executor = lib._direct_executor_create()  # noqa: SLF001
+            else:
+                self._executor = lib.Cronet_Executor_CreateWith(
+                    lib._executor_execute,  # noqa: SLF001
+                )
+                lib.Cronet_Executor_SetClientContext(
+                    self._executor,
+                    self._handle,
+                )
 
         self._processing_allowed = True
 
-        if self._worker is None:
+        if self._worker is None and not self._direct:
             self._worker = asyncio.create_task(self._spawn_worker_thread())
 
         return self
@@ -87,4 +96,6 @@ class ExecutorManager:
 
     def shutdown(self, *, process_pending: bool = True) -> None:
         self._processing_allowed = process_pending
-        self._queue.put_nowait(None)
+
+        if not self._direct:
+            self._queue.put_nowait(None)
@@ -1,8 +1,8 @@
+import asyncio
 import contextlib
 from http import HTTPStatus
 from typing import cast, Self, TYPE_CHECKING
 
-from bookmarkmgr.asyncio import ThreadSafeEvent
 from bookmarkmgr.cronet._cronet import ffi, lib
 from bookmarkmgr.cronet.errors import (
     _raise_for_error_result,
@@ -10,45 +10,36 @@ from bookmarkmgr.cronet.errors import (
     NotContextManagerError,
     RequestError,
 )
-from bookmarkmgr.cronet.models import RequestParameters, Response
+from bookmarkmgr.cronet.models import Headers, RequestParameters, Response
 
 if TYPE_CHECKING:
+    from collections.abc import Collection
+
+    from bookmarkmgr.cronet.types import (
+        Error as Error_,
+    )
     from bookmarkmgr.cronet.types import (
-        Buffer,
-        Result,
         String,
         UrlRequest,
         UrlRequestCallback,
         UrlResponseInfo,
     )
-    from bookmarkmgr.cronet.types import (
-        Error as Error_,
-    )
-
 
-def _cancel_request_on_error(
-    result: Result,
-    request: UrlRequest,
-    manager: RequestCallbackManager,
-) -> bool:
-    try:
-        _raise_for_error_result(result)
-    except Error as error:
-        lib.Cronet_UrlRequest_Cancel(request)
-
-        manager._error = error  # noqa: SLF001
-
-        return True
 
-    return False
+def _resolve_future(future: asyncio.Future[None]) -> None:
+    if not future.done():
+        future.set_result(None)
 
 
 def _get_manager(callback: UrlRequestCallback) -> RequestCallbackManager:
+    context = ffi.cast(
+        "_RequestContext *",
+        lib.Cronet_UrlRequestCallback_GetClientContext(callback),
+    )
+
     return cast(
         "RequestCallbackManager",
-        ffi.from_handle(
-            lib.Cronet_UrlRequestCallback_GetClientContext(callback),
-        ),
+        ffi.from_handle(context.handle),
     )
 
 
@@ -77,11 +68,7 @@ def _process_response(
         with contextlib.suppress(ValueError):
             reason = HTTPStatus(status_code).phrase
 
-    response = Response(
-        url=url,
-        status_code=status_code,
-        reason=reason,
-    )
+    headers = []
 
     for index in range(
         lib.Cronet_UrlResponseInfo_all_headers_list_size(response_info),
@@ -90,9 +77,19 @@ def _process_response(
             response_info,
             index,
         )
-        response.headers[
-            ffi.string(lib.Cronet_HttpHeader_name_get(header)).decode()
-        ] = ffi.string(lib.Cronet_HttpHeader_value_get(header)).decode()
+        headers.append(
+            (
+                ffi.string(lib.Cronet_HttpHeader_name_get(header)),
+                ffi.string(lib.Cronet_HttpHeader_value_get(header)),
+            ),
+        )
+
+    response = Response(
+        url=url,
+        status_code=status_code,
+        reason=reason,
+        headers=Headers(headers),
+    )
 
     manager._response = response  # noqa: SLF001
 
@@ -114,47 +111,27 @@ def _on_request_redirect_received(
     lib.Cronet_UrlRequest_Cancel(request)
 
 
+# Reading of the response body is started natively once this returns.
 @ffi.def_extern()
 def _on_request_response_started(
     callback: UrlRequestCallback,
-    request: UrlRequest,
+    request: UrlRequest,  # noqa: ARG001
     response_info: UrlResponseInfo,
 ) -> None:
     manager = _get_manager(callback)
 
-    _process_response(manager, response_info)
-
-    buffer = lib.Cronet_Buffer_Create()
-    lib.Cronet_Buffer_InitWithAlloc(buffer, 32 * 1024)
-
-    _cancel_request_on_error(
-        lib.Cronet_UrlRequest_Read(request, buffer),
-        request,
-        manager,
-    )
-
-
-@ffi.def_extern()
-def _on_request_read_completed(
-    callback: UrlRequestCallback,
-    request: UrlRequest,
-    response_info: UrlResponseInfo,  # noqa: ARG001
-    buffer: Buffer,
-    bytes_read: int,
-) -> None:
-    manager = _get_manager(callback)
-
-    response = cast("Response", manager._response)  # noqa: SLF001
-    response.content += ffi.string(
-        ffi.cast("char*", lib.Cronet_Buffer_GetData(buffer)),
-        bytes_read,
-    )
+    response = _process_response(manager, response_info)
 
-    _cancel_request_on_error(
-        lib.Cronet_UrlRequest_Read(request, buffer),
-        request,
-        manager,
-    )
+    if (
+        manager.content_types is not None
+        and response.content_type is not None
+        and response.content_type not in manager.content_types
+    ) or (
+        manager.max_content_length is not None
+        and response.content_length is not None
+        and response.content_length > manager.max_content_length
+    ):
+        manager._context.skip_body = True  # noqa: SLF001
 
 
 @ffi.def_extern()
@@ -164,7 +141,7 @@ def _on_request_succeeded(
     response_info: UrlResponseInfo,  # noqa: ARG001
 ) -> None:
     manager = _get_manager(callback)
-    manager._is_done.set()  # noqa: SLF001
+    manager._set_done()  # noqa: SLF001
 
 
 @ffi.def_extern()
@@ -185,7 +162,7 @@ def _on_request_failed(
         ),
         code=lib.Cronet_Error_error_code_get(error),
     )
-    manager._is_done.set()  # noqa: SLF001
+    manager._set_done()  # noqa: SLF001
 
 
 @ffi.def_extern()
@@ -195,7 +172,7 @@ def _on_request_canceled(
     response_info: UrlResponseInfo,  # noqa: ARG001
 ) -> None:
     manager = _get_manager(callback)
-    manager._is_done.set()  # noqa: SLF001
+    manager._set_done()  # noqa: SLF001
 
 
 class RequestCallbackManager:
@@ -205,28 +182,37 @@ class RequestCallbackManager:
     def __init__(
         self,
         request_parameters: RequestParameters,
+        *,
+        content_types: Collection[str] | None = None,
+        max_body_size: int | None = None,
+        max_content_length: int | None = None,
     ) -> None:
+        self.content_types = content_types
+        self.max_content_length = max_content_length
         self._handle = ffi.new_handle(self)
         self._callback: UrlRequestCallback | None = None
-        self._is_done = ThreadSafeEvent()
+        self._context = ffi.new("_RequestContext *")
+        self._context.handle = self._handle
+        self._context.max_body_size = max_body_size or 0
+        self._is_done: asyncio.Future[None] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
         self.request_parameters = request_parameters
 
     async def __aenter__(self) -> Self:
         if self._callback is None:
-            self._callback = lib.Cronet_UrlRequestCallback_CreateWith(
-                lib._on_request_redirect_received,  # noqa: SLF001
-                lib._on_request_response_started,  # noqa: SLF001
-                lib._on_request_read_completed,  # noqa: SLF001
-                lib._on_request_succeeded,  # noqa: SLF001
-                lib._on_request_failed,  # noqa: SLF001
-                lib._on_request_canceled,  # noqa: SLF001
-            )
+            self._callback = lib._url_request_callback_create()  # noqa: SLF001
             lib.Cronet_UrlRequestCallback_SetClientContext(
                 self._callback,
-                self._handle,
+                self._context,
             )
 
-        self._is_done.clear()
+        self._loop = asyncio.get_running_loop()
+        self._is_done = self._loop.create_future()
+
+        lib._request_context_release_body(self._context)  # noqa: SLF001
+        self._context.result = lib.Cronet_RESULT_SUCCESS
+        self._context.out_of_memory = False
+        self._context.skip_body = False
 
         self._error = None
         self._response = None
@@ -237,6 +223,8 @@ class RequestCallbackManager:
         self,
         *_: object,
     ) -> None:
+        lib._request_context_release_body(self._context)  # noqa: SLF001
+
         if self._callback is None:
             return
 
@@ -250,15 +238,53 @@ class RequestCallbackManager:
 
         return self._callback
 
+    # May be called from any thread, including the network thread when
+    # runnables are executed directly.
+    def _set_done(self) -> None:
+        if self._loop is None or self._is_done is None:
+            return
+
+        self._loop.call_soon_threadsafe(_resolve_future, self._is_done)
+
+    async def wait_done(self) -> None:
+        """Wait for the request to finish, even if waiting is cancelled."""
+        if self._is_done is None:
+            raise NotContextManagerError
+
+        cancelled = False
+
+        while not self._is_done.done():
+            try:
+                await asyncio.shield(self._is_done)
+            except asyncio.CancelledError:
+                cancelled = True
+
+        if cancelled:
+            raise asyncio.CancelledError
+
     async def response(self) -> Response:
-        if not self._is_done.is_set():
-            await self._is_done.wait()
+        if self._is_done is None:
+            raise NotContextManagerError
+
+        await self._is_done
 
         if self._error is not None:
             raise self._error
 
+        if self._context.out_of_memory:
+            raise MemoryError
+
+        _raise_for_error_result(self._context.result)
+
         if self._response is None:
             message = "Response is unavailable, request may not have finished"
             raise Error(message)
 
+        if self._context.body_size:
+            self._response.content = ffi.unpack(
+                self._context.body,
+                self._context.body_size,
+            )
+            lib._request_context_release_body(self._context)  # noqa: SLF001
+
         return self._response
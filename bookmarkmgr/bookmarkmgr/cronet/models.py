@@ -1,9 +1,10 @@
 from dataclasses import dataclass, field
 from http import HTTPStatus
-from http.client import HTTPMessage
 import json
-from typing import Any
-from urllib.request import Request
+from typing import Any, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
 
 
 @dataclass(slots=True)
@@ -19,10 +20,59 @@ class ResponseStatus:
         )
 
 
-class RequestParameters(Request):
-    @property
-    def url(self) -> str:
-        return self.full_url
+class Headers:
+    """Case-insensitive multidict view of raw response headers."""
+
+    __slots__ = ("raw",)
+
+    def __init__(self, raw: Iterable[tuple[bytes, bytes]] = ()) -> None:
+        self.raw = list(raw)
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self.get(name) is not None
+
+    def __getitem__(self, name: str) -> str:
+        if (value := self.get(name)) is None:
+            raise KeyError(name)
+
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name, _ in self.items())
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def _values(self, name: str) -> Iterator[str]:
+        key = name.lower().encode()
+
+        return (
+            _decode_header(value)
+            for raw_name, value in self.raw
+            if raw_name.lower() == key
+        )
+
+    def get(self, name: str, default: str | None = None) -> str | None:
+        return next(self._values(name), default)
+
+    def get_all(self, name: str) -> list[str]:
+        return list(self._values(name))
+
+    def items(self) -> Iterator[tuple[str, str]]:
+        return (
+            (_decode_header(name), _decode_header(value))
+            for name, value in self.raw
+        )
+
+
+def _decode_header(value: bytes) -> str:
+    return value.decode(errors="replace")
+
+
+@dataclass(frozen=True, slots=True)
+class RequestParameters:
+    method: str
+    url: str
 
 
 @dataclass(slots=True)
@@ -31,13 +81,27 @@ class Response(ResponseStatus):
     reason: str
     charset: str = "utf-8"
     content: bytes = b""
-    headers: HTTPMessage = field(
-        default_factory=HTTPMessage,
+    headers: Headers = field(
+        default_factory=Headers,
     )
     redirect_url: str | None = None
 
-    def info(self) -> HTTPMessage:
-        return self.headers
+    @property
+    def content_length(self) -> int | None:
+        if (content_length := self.headers.get("Content-Length")) is None:
+            return None
+
+        try:
+            return int(content_length)
+        except ValueError:
+            return None
+
+    @property
+    def content_type(self) -> str | None:
+        if (content_type := self.headers.get("Content-Type")) is None:
+            return None
+
+        return content_type.split(";", 1)[0].strip().lower()
 
     def json(self) -> Any:  # type: ignore[explicit-any]
         return json.loads(
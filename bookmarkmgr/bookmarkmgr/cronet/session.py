@@ -1,7 +1,5 @@
 import asyncio
 from http import HTTPStatus
-from http.cookiejar import CookieJar
-from itertools import chain
 from typing import override, Self, TYPE_CHECKING, TypedDict, Unpack
 
 from yarl import URL
@@ -9,6 +7,7 @@ from yarl import URL
 from bookmarkmgr.asyncio import RateLimiter
 
 from ._cronet import lib
+from .cookies import CookieStore
 from .default_headers import DEFAULT_HEADERS
 from .errors import (
     _raise_for_error_result,
@@ -16,6 +15,7 @@ from .errors import (
     NotContextManagerError,
     RequestError,
 )
+from .headers import PreparedHeaders
 from .logging import logger
 from .managers.executor import ExecutorManager
 from .managers.request_callback import RequestCallbackManager
@@ -23,9 +23,18 @@ from .models import RequestParameters, Response
 from .utils import adestroying, destroying
 
 if TYPE_CHECKING:
-    from collections.abc import Awaitable, Callable, Iterable, Mapping
+    from collections.abc import (
+        Awaitable,
+        Callable,
+        Collection,
+        Iterable,
+        Mapping,
+    )
+    from pathlib import Path
 
-    from .types import Engine, StrOrURL
+    from .types import Engine, StrOrURL, UrlRequestParams
+
+DEFAULT_HOST_RATE_LIMIT = (1, 1)
 
 INIT_MAX_RETRY_ATTEMPTS = 5
 
@@ -57,14 +66,31 @@ RETRYABLE_STATUS_CODES = {
 }
 
 
+class _SessionOptions(TypedDict, total=False):
+    cookie_file: Path | None
+    direct_executor: bool
+
+
 class _SessionRequestOptions(TypedDict, total=False):
     params: Mapping[str, str]
     allow_redirects: bool
+    # The body of responses of other content types isn't read.
+    content_types: Collection[str]
+    headers: Iterable[tuple[str, str]]
+    max_body_size: int
+    # The body of responses with a larger Content-Length isn't read.
+    max_content_length: int
 
 
 class Session:
-    def __init__(self) -> None:
-        self.cookie_jar = CookieJar()
+    def __init__(self, **kwargs: Unpack[_SessionOptions]) -> None:
+        # Cookies are loaded when the session is opened and saved when it's
+        # closed.
+        self.cookie_jar = CookieStore(kwargs.get("cookie_file"))
+        self._default_headers = PreparedHeaders(DEFAULT_HEADERS)
+        # Runs Cronet callbacks on its network thread instead of handing them
+        # over to a worker thread first.
+        self._direct_executor = kwargs.get("direct_executor", False)
         self._engine: Engine | None = None
 
     async def __aenter__(self) -> Self:
@@ -78,6 +104,21 @@ class Session:
     ) -> None:
         self.close()
 
+    def _add_request_headers(
+        self,
+        parameters: UrlRequestParams,
+        url: URL,
+        headers: Iterable[tuple[str, str]] = (),
+    ) -> None:
+        self._default_headers.add_to(parameters)
+
+        headers = list(headers)
+
+        if (cookie_header := self.cookie_jar.cookie_header(url)) is not None:
+            headers.append(("Cookie", cookie_header))
+
+        PreparedHeaders(headers).add_to(parameters)
+
     def _dispose_engine(self) -> None:
         if self._engine is None:
             return
@@ -89,6 +130,8 @@ class Session:
         if self._engine is not None:
             return
 
+        self.cookie_jar.load()
+
         self._engine = lib.Cronet_Engine_Create()
 
         try:
@@ -123,6 +166,8 @@ class Session:
         _raise_for_error_result(lib.Cronet_Engine_Shutdown(self._engine))
         self._dispose_engine()
 
+        self.cookie_jar.save()
+
     async def delete(
         self,
         url: StrOrURL,
@@ -198,13 +243,10 @@ class Session:
         if params is not None:
             url = url.update_query(params)
 
-        url = str(url)
-
         request_params = RequestParameters(
             method=method,
-            url=url,
+            url=str(url),
         )
-        self.cookie_jar.add_cookie_header(request_params)
 
         async with (
             adestroying(
@@ -217,35 +259,33 @@ class Session:
             ) as request,
             RequestCallbackManager(
                 request_params,
+                content_types=kwargs.get("content_types"),
+                max_body_size=kwargs.get("max_body_size"),
+                max_content_length=kwargs.get("max_content_length"),
             ) as callback_manager,
-            ExecutorManager() as executor_manager,
+            ExecutorManager(
+                direct=self._direct_executor,
+            ) as executor_manager,
         ):
             lib.Cronet_UrlRequestParams_http_method_set(
                 parameters,
                 method.encode(),
             )
-            for name, value in chain(
-                DEFAULT_HEADERS,
-                request_params.unredirected_hdrs.items(),
-                request_params.headers.items(),
-            ):
-                with destroying(
-                    lib.Cronet_HttpHeader_Create(),
-                    lib.Cronet_HttpHeader_Destroy,
-                ) as header:
-                    lib.Cronet_HttpHeader_name_set(header, name.encode())
-                    lib.Cronet_HttpHeader_value_set(header, value.encode())
-
-                    lib.Cronet_UrlRequestParams_request_headers_add(
-                        parameters,
-                        header,
-                    )
+            lib.Cronet_UrlRequestParams_allow_direct_executor_set(
+                parameters,
+                self._direct_executor,
+            )
+            self._add_request_headers(
+                parameters,
+                url,
+                kwargs.get("headers", ()),
+            )
 
             _raise_for_error_result(
                 lib.Cronet_UrlRequest_InitWithParams(
                     request,
                     self._engine,
-                    url.encode(),
+                    request_params.url.encode(),
                     parameters,
                     callback_manager.callback,
                     executor_manager.executor,
@@ -258,19 +298,24 @@ class Session:
                 response = await callback_manager.response()
             except:
                 lib.Cronet_UrlRequest_Cancel(request)
+
+                # Callbacks run directly on the network thread may still use
+                # the callback and its context until the request finishes,
+                # unlike queued ones, which are dropped on shutdown.
+                if self._direct_executor:
+                    await callback_manager.wait_done()
+
                 raise
 
         self.cookie_jar.extract_cookies(
-            # Method signature requires `response` to be HTTPResponse while it
-            # only calls its info() method.
-            response,  # type: ignore[bad-argument-type]
-            request_params,
+            url,
+            response.headers.get_all("Set-Cookie"),
         )
 
         return response
 
 
-class _RetrySessionOptions(TypedDict, total=False):
+class _RetrySessionOptions(_SessionOptions, total=False):
     rate_limit_timeout: float
 
 
@@ -287,9 +332,9 @@ class RetrySession(Session):
         self,
         **kwargs: Unpack[_RetrySessionOptions],
     ) -> None:
-        super().__init__()
+        self.__rate_limit_timeout = kwargs.pop("rate_limit_timeout", 60)
 
-        self.__rate_limit_timeout = kwargs.get("rate_limit_timeout", 60)
+        super().__init__(**kwargs)
 
     async def _request(
         self,
@@ -446,9 +491,11 @@ class RateLimitedSession(RetrySession):
     def __init__(
         self,
         rate_limiter: RateLimiter,
+        **kwargs: Unpack[_SessionOptions],
     ) -> None:
         super().__init__(
             rate_limit_timeout=rate_limiter.period,
+            **kwargs,
         )
 
         self._rate_limiter = rate_limiter
@@ -510,7 +557,9 @@ class PerHostnameRateLimitedSession(RetrySession):
         hostname = url.host.lower()
 
         if hostname not in self.__rate_limiters:
-            self.__rate_limiters[hostname] = RateLimiter(1, 1)
+            self.__rate_limiters[hostname] = RateLimiter(
+                *DEFAULT_HOST_RATE_LIMIT,
+            )
 
         async with self.__rate_limiters[hostname]:
             return await super()._request(
@@ -12,6 +12,7 @@ RawData = NewType("RawData", object)
 Result = NewType("Result", int)
 Runnable = NewType("Runnable", object)
 String = NewType("String", object)
+StringArray = NewType("StringArray", object)
 UrlRequest = NewType("UrlRequest", object)
 UrlRequestCallback = NewType("UrlRequestCallback", object)
 UrlResponseInfo = NewType("UrlResponseInfo", object)
@@ -0,0 +1,428 @@
+import asyncio
+from datetime import datetime, UTC
+import hashlib
+from html import escape
+import json
+import os
+from typing import BinaryIO, cast, TYPE_CHECKING, TypedDict
+
+from bookmarkmgr.logging import get_logger
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterable, AsyncIterator
+    from pathlib import Path
+
+    from bookmarkmgr.clients.raindrop import (
+        Collection,
+        RaindropIn,
+        RaindropOut,
+    )
+
+logger = get_logger()
+
+_HASH_CHUNK_SIZE = 64 * 1024
+
+# Exports of collections used to be printed, so they are still terminated by
+# a newline.
+EXPORT_TERMINATOR = b"\n"
+
+# Entries are rendered in chunks of this many raindrops.
+_RENDER_CHUNK_SIZE = 1000
+
+_HEADER = """<!DOCTYPE NETSCAPE-Bookmark-file-1>
+<!-- This is an automatically generated file.
+     It will be read and overwritten.
+     DO NOT EDIT! -->
+<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">
+<TITLE>Raindrop.io Bookmarks</TITLE>
+<H1>Raindrop.io Bookmarks</H1>
+<DL><p>
+"""
+_FOOTER = "</DL><p>"
+# Raindrops are listed in a folder of their collection.
+_FOLDER_FOOTER = "    </DL><p>\n"
+
+_INDEX_VERSION = 2
+
+
+class _ExportIndex(TypedDict):
+    version: int
+    size: int
+    mtime_ns: int
+    header_hash: str
+    # ID, offset, length and hash of each entry, in order.
+    entries: list[tuple[int, int, int, str]]
+
+
+type _Entry = tuple[int, bytes]
+
+
+def _hash_file(path: Path) -> bytes | None:
+    file_hash = hashlib.blake2b()
+
+    try:
+        with path.open("rb") as f:
+            while chunk := f.read(_HASH_CHUNK_SIZE):
+                file_hash.update(chunk)
+    except FileNotFoundError:
+        return None
+
+    return file_hash.digest()
+
+
+def _hash_entry(entry: bytes) -> str:
+    return hashlib.blake2b(entry, digest_size=16).hexdigest()
+
+
+def _load_export_index(index_path: Path) -> _ExportIndex | None:
+    try:
+        with index_path.open() as f:
+            index: _ExportIndex = json.load(f)
+    except FileNotFoundError:
+        return None
+    except ValueError:
+        logger.warning("Ignoring invalid export index %s", index_path)
+        return None
+
+    return index if index["version"] == _INDEX_VERSION else None
+
+
+def _save_export_index(
+    index_path: Path,
+    path: Path,
+    header: bytes,
+    entries: list[tuple[int, int, int, str]],
+) -> None:
+    stat = path.stat()
+    index: _ExportIndex = {
+        "version": _INDEX_VERSION,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "header_hash": _hash_entry(header),
+        "entries": entries,
+    }
+
+    temporary_path = index_path.with_name(f".{index_path.name}.tmp")
+
+    with temporary_path.open("w") as f:
+        json.dump(index, f)
+
+    temporary_path.replace(index_path)
+
+
+def _index_entries(
+    entries: list[_Entry],
+    offset: int,
+) -> list[tuple[int, int, int, str]]:
+    indexed_entries = []
+
+    for raindrop_id, entry in entries:
+        indexed_entries.append(
+            (raindrop_id, offset, len(entry), _hash_entry(entry)),
+        )
+        offset += len(entry)
+
+    return indexed_entries
+
+
+def _copy_file(path: Path, destination: BinaryIO) -> None:
+    # Files are copied by the kernel, which may share their extents instead
+    # of copying data, depending on the file system.
+    with path.open("rb") as f:
+        remaining_size = os.fstat(f.fileno()).st_size
+
+        while remaining_size > 0 and (
+            copied_size := os.copy_file_range(
+                f.fileno(),
+                destination.fileno(),
+                remaining_size,
+            )
+        ):
+            remaining_size -= copied_size
+
+
+def _patch_entries(
+    f: BinaryIO,
+    index: _ExportIndex,
+    entries: list[_Entry],
+    footer: bytes,
+    changed_positions: list[int],
+) -> None:
+    # Entries are rewritten in place while their length doesn't change.
+    # Entries following the first one with a different length are shifted,
+    # so they are all rewritten.
+    shift_position = next(
+        (
+            position
+            for position in changed_positions
+            if len(entries[position][1]) != index["entries"][position][2]
+        ),
+        None,
+    )
+
+    for position in changed_positions:
+        if position == shift_position:
+            break
+
+        f.seek(index["entries"][position][1])
+        f.write(entries[position][1])
+
+    if shift_position is not None:
+        f.seek(index["entries"][shift_position][1])
+
+        f.writelines(entry for _, entry in entries[shift_position:])
+
+        f.write(footer)
+        f.truncate()
+
+
+def _patch_export(
+    path: Path,
+    index: _ExportIndex,
+    header: bytes,
+    entries: list[_Entry],
+    footer: bytes,
+) -> list[tuple[int, int, int, str]] | None:
+    """Patch an export in a copy replacing it, or return None if stale."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+
+    if (
+        stat.st_size != index["size"]
+        or stat.st_mtime_ns != index["mtime_ns"]
+        or _hash_entry(header) != index["header_hash"]
+        or len(entries) != len(index["entries"])
+        or any(
+            raindrop_id != indexed_entry[0]
+            for (raindrop_id, _), indexed_entry in zip(
+                entries,
+                index["entries"],
+                strict=True,
+            )
+        )
+    ):
+        return None
+
+    changed_positions = [
+        position
+        for position, ((_, entry), (_, _, _, entry_hash)) in enumerate(
+            zip(entries, index["entries"], strict=True),
+        )
+        if _hash_entry(entry) != entry_hash
+    ]
+
+    if not changed_positions:
+        return index["entries"]
+
+    # The export is patched in a copy, so that it's never left partially
+    # written.
+    temporary_path = path.with_name(f".{path.name}.tmp")
+
+    try:
+        with temporary_path.open("w+b") as f:
+            _copy_file(path, f)
+            _patch_entries(f, index, entries, footer, changed_positions)
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        temporary_path.replace(path)
+    finally:
+        temporary_path.unlink(missing_ok=True)
+
+    logger.info("Patched %d entries of %s", len(changed_positions), path)
+
+    return _index_entries(entries, index["entries"][0][1])
+
+
+def _write_indexed_export(
+    path: Path,
+    index_path: Path,
+    header: bytes,
+    entries: list[_Entry],
+    footer: bytes,
+) -> None:
+    if (index := _load_export_index(index_path)) is not None and (
+        indexed_entries := _patch_export(
+            path,
+            index,
+            header,
+            entries,
+            footer,
+        )
+    ) is not None:
+        if indexed_entries is not index["entries"]:
+            _save_export_index(index_path, path, header, indexed_entries)
+
+        return
+
+    logger.info("Writing whole export to %s", path)
+
+    temporary_path = path.with_name(f".{path.name}.tmp")
+
+    try:
+        with temporary_path.open("wb") as f:
+            f.write(header)
+
+            for _, entry in entries:
+                f.write(entry)
+
+            f.write(footer)
+
+        temporary_path.replace(path)
+    finally:
+        temporary_path.unlink(missing_ok=True)
+
+    _save_export_index(
+        index_path,
+        path,
+        header,
+        _index_entries(entries, len(header)),
+    )
+
+
+def _timestamp(iso_datetime: str) -> int:
+    return int(datetime.fromisoformat(iso_datetime).timestamp())
+
+
+def render_entry(raindrop: RaindropOut) -> str:
+    add_date = _timestamp(raindrop["created"])
+    # Only listed raindrops have the time of their last update.
+    last_update = cast("dict[str, str]", raindrop).get("lastUpdate")
+    last_modified = (
+        add_date if last_update is None else _timestamp(last_update)
+    )
+
+    entry = (
+        f'        <DT><A HREF="{escape(raindrop["link"])}" '
+        f'ADD_DATE="{add_date}" LAST_MODIFIED="{last_modified}" '
+        f'TAGS="{escape(",".join(raindrop["tags"]))}" '
+        f'DATA-COVER="{escape(raindrop["cover"])}">'
+        f"{escape(raindrop['title'])}</A>\n"
+    )
+
+    if raindrop["note"]:
+        entry += f"        <DD>{escape(raindrop['note'], quote=False)}\n"
+
+    return entry
+
+
+def _render_header(collection: Collection) -> str:
+    dates = ""
+
+    if "created" in collection:
+        dates += f' ADD_DATE="{_timestamp(collection["created"])}"'
+
+    if "lastUpdate" in collection:
+        dates += f' LAST_MODIFIED="{_timestamp(collection["lastUpdate"])}"'
+
+    return (
+        f"{_HEADER}    <DT><H3{dates}>"
+        f"{escape(collection['title'], quote=False)}</H3>\n"
+        "    <DL><p>\n"
+    )
+
+
+class BookmarkExport:
+    """Raindrops of collections, rendered as a Raindrop HTML export."""
+
+    def __init__(self) -> None:
+        self._collection_ids: dict[int, int] = {}
+        self._raindrops: dict[int, RaindropOut] = {}
+
+    def add(self, collection_id: int, raindrop: RaindropOut) -> None:
+        self._collection_ids[raindrop["_id"]] = collection_id
+        self._raindrops[raindrop["_id"]] = raindrop
+
+    def update(self, raindrop_id: int, raindrop: RaindropIn) -> None:
+        if (original_raindrop := self._raindrops.get(raindrop_id)) is None:
+            return
+
+        updated_raindrop = cast(
+            "RaindropOut",
+            {
+                **original_raindrop,
+                **raindrop,
+                "lastUpdate": datetime.now(tz=UTC).isoformat(),
+            },
+        )
+        self._raindrops[raindrop_id] = updated_raindrop
+
+    def get_raindrops(self, collection_id: int) -> list[RaindropOut]:
+        return sorted(
+            (
+                raindrop
+                for raindrop_id, raindrop in self._raindrops.items()
+                if self._collection_ids[raindrop_id] == collection_id
+            ),
+            key=lambda raindrop: (raindrop["created"], raindrop["_id"]),
+            reverse=True,
+        )
+
+    async def render(self, collection: Collection) -> AsyncIterator[bytes]:
+        raindrops = self.get_raindrops(collection["_id"])
+
+        yield _render_header(collection).encode()
+
+        for start in range(0, len(raindrops), _RENDER_CHUNK_SIZE):
+            yield "".join(
+                map(
+                    render_entry,
+                    raindrops[start : start + _RENDER_CHUNK_SIZE],
+                ),
+            ).encode()
+
+            await asyncio.sleep(0)
+
+        yield (_FOLDER_FOOTER + _FOOTER).encode()
+
+    async def write_indexed(
+        self,
+        collection: Collection,
+        path: Path,
+        index_path: Path,
+    ) -> None:
+        """Write an export of a collection, patching changed entries."""
+        entries = [
+            (raindrop["_id"], render_entry(raindrop).encode())
+            for raindrop in self.get_raindrops(collection["_id"])
+        ]
+
+        await asyncio.to_thread(
+            _write_indexed_export,
+            path,
+            index_path,
+            _render_header(collection).encode(),
+            entries,
+            (_FOLDER_FOOTER + _FOOTER).encode() + EXPORT_TERMINATOR,
+        )
+
+
+async def write_export_to_file(
+    chunks: AsyncIterable[bytes],
+    path: Path,
+) -> None:
+    # The export is written to a temporary file, which replaces the output
+    # file only if its content differs, so that the file isn't modified
+    # needlessly or left partially written.
+    temporary_path = path.with_name(f".{path.name}.tmp")
+    export_hash = hashlib.blake2b()
+
+    try:
+        with temporary_path.open("wb") as f:
+            async for chunk in chunks:
+                f.write(chunk)
+                export_hash.update(chunk)
+
+            f.write(EXPORT_TERMINATOR)
+            export_hash.update(EXPORT_TERMINATOR)
+
+        if await asyncio.to_thread(_hash_file, path) == export_hash.digest():
+            logger.info("Export is unchanged, keeping %s", path)
+            return
+
+        temporary_path.replace(path)
+    finally:
+        temporary_path.unlink(missing_ok=True)
@@ -0,0 +1,223 @@
+import json
+import os
+from typing import cast, Literal, Self, TYPE_CHECKING, TypedDict
+
+from bookmarkmgr.logging import get_logger
+
+if TYPE_CHECKING:
+    from io import BufferedWriter
+    from pathlib import Path
+
+    from bookmarkmgr.clients.raindrop import RaindropIn
+
+logger = get_logger()
+
+# Entries are flushed to the OS as they're appended, so they survive a crash
+# of the process, and synced to disk in batches of this many entries.
+_SYNC_ENTRY_COUNT = 100
+
+
+class _ArchivalJobEntry(TypedDict):
+    type: Literal["archival-job"]
+    id: int
+    service: str
+    link: str
+    job: str
+
+
+# Appended when a run finishes without errors.
+class _FinishedEntry(TypedDict):
+    type: Literal["finished"]
+
+
+class _SentEntry(TypedDict):
+    type: Literal["sent"]
+    id: int
+
+
+class _UpdateEntry(TypedDict):
+    type: Literal["update"]
+    id: int
+    raindrop: RaindropIn
+    completed: bool
+
+
+type _Entry = _ArchivalJobEntry | _FinishedEntry | _SentEntry | _UpdateEntry
+
+
+class Journal:
+    """Append-only journal of maintenance results."""
+
+    _file: BufferedWriter | None = None
+
+    def __init__(self, path: Path, *, resume: bool = False) -> None:
+        self.path = path
+        self.resume = resume
+
+        self.completed: set[int] = set()
+        # Whether the last run journaled finished, or there was none.
+        self.finished = True
+        self.pending_updates: dict[int, RaindropIn] = {}
+
+        self._archival_jobs: dict[tuple[int, str], tuple[str, str]] = {}
+        self._unsynced_entry_count = 0
+
+    def __enter__(self) -> Self:
+        if self.resume and self.path.exists():
+            # Removes the incomplete entry, so that new entries aren't
+            # appended to it.
+            os.truncate(self.path, self._replay())
+            self._log_resumption()
+            self._file = self.path.open("ab")
+        else:
+            self._file = self.path.open("wb")
+
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        *_: object,
+    ) -> None:
+        if self._file is None:
+            return
+
+        if exc_type is None:
+            self._append({"type": "finished"})
+
+        self.sync()
+        self._file.close()
+        self._file = None
+
+    def _apply(self, entry: _Entry) -> None:
+        self.finished = entry["type"] == "finished"
+
+        match entry["type"]:
+            case "archival-job":
+                self._archival_jobs[entry["id"], entry["service"]] = (
+                    entry["link"],
+                    entry["job"],
+                )
+            case "finished":
+                self._archival_jobs.clear()
+                self.completed.clear()
+            case "sent":
+                self.pending_updates.pop(entry["id"], None)
+            case "update":
+                if entry["completed"]:
+                    self.completed.add(entry["id"])
+
+                if entry["raindrop"]:
+                    self.pending_updates[entry["id"]] = entry["raindrop"]
+
+    def _append(self, entry: _Entry) -> None:
+        if self._file is None:
+            message = "Journal is not open"
+            raise RuntimeError(message)
+
+        self._apply(entry)
+
+        self._file.write(f"{json.dumps(entry)}\n".encode())
+        self._file.flush()
+        self._unsynced_entry_count += 1
+
+        if self._unsynced_entry_count >= _SYNC_ENTRY_COUNT:
+            self.sync()
+
+    def _replay(self) -> int:
+        valid_size = 0
+
+        with self.path.open("rb") as file:
+            for line in file:
+                try:
+                    entry = cast("_Entry", json.loads(line))
+                except json.JSONDecodeError:
+                    # Only the last entry may be incomplete.
+                    logger.warning("Ignoring incomplete journal entry")
+                    break
+
+                self._apply(entry)
+                valid_size += len(line)
+
+        return valid_size
+
+    def _log_resumption(self) -> None:
+        logger.info(
+            "Resuming with %d completed raindrops and %d pending updates",
+            len(self.completed),
+            len(self.pending_updates),
+        )
+
+    def archival_job(
+        self,
+        raindrop_id: int,
+        service: str,
+        link: str,
+    ) -> str | None:
+        journaled_link, job = self._archival_jobs.get(
+            (raindrop_id, service),
+            (None, None),
+        )
+
+        return job if journaled_link == link else None
+
+    def read(self) -> None:
+        """Replay the journal to be resumed without opening it for writing."""
+        if self.resume and self.path.exists():
+            self._replay()
+            self._log_resumption()
+
+    @classmethod
+    def is_unfinished(cls, path: Path) -> bool:
+        if not path.exists():
+            return False
+
+        journal = cls(path)
+        journal._replay()
+
+        return not journal.finished
+
+    def record_archival_job(
+        self,
+        raindrop_id: int,
+        service: str,
+        link: str,
+        job: str,
+    ) -> None:
+        self._append(
+            {
+                "type": "archival-job",
+                "id": raindrop_id,
+                "service": service,
+                "link": link,
+                "job": job,
+            },
+        )
+
+    def record_sent(self, raindrop_id: int) -> None:
+        self._append({"type": "sent", "id": raindrop_id})
+
+    def record_update(
+        self,
+        raindrop_id: int,
+        raindrop: RaindropIn,
+        *,
+        completed: bool,
+    ) -> None:
+        self._append(
+            {
+                "type": "update",
+                "id": raindrop_id,
+                "raindrop": raindrop,
+                "completed": completed,
+            },
+        )
+
+    def sync(self) -> None:
+        if self._file is None:
+            return
+
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+        self._unsynced_entry_count = 0
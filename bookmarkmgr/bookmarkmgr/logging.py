@@ -2,6 +2,8 @@ import logging
 
 from . import DEBUG
 
+LOG_FORMAT = f"%(asctime)s:{logging.BASIC_FORMAT}"
+
 
 def get_logger(name: str = "bookmarkmgr") -> logging.Logger:
     logger = logging.getLogger(name)
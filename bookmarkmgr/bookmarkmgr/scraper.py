@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from enum import StrEnum, unique
 import gc
 from html.parser import HTMLParser
 from http import HTTPStatus
@@ -9,6 +10,14 @@ from yarl import URL
 from bookmarkmgr import asyncio, cronet
 from bookmarkmgr.cronet import RequestError, ResponseStatus, RetrySession
 
+HTML_CONTENT_TYPES = {
+    "application/xhtml+xml",
+    "text/html",
+}
+
+# Larger resources aren't loaded, even if they're declared as HTML.
+MAX_PAGE_SIZE = 16 * 1024 * 1024
+
 INVALID_HTML_PARENTS = {
     "base",
     "link",
@@ -16,6 +25,14 @@ INVALID_HTML_PARENTS = {
 }
 
 
+@unique
+class ProbeMethod(StrEnum):
+    """Request used to find out the content type before a page is loaded."""
+
+    HEAD = "head"
+    RANGE = "range"
+
+
 @dataclass(slots=True)
 class Page:
     body_text: str = ""
@@ -134,9 +151,72 @@ def _scrape_html(html: str) -> Page:
     return html_parser.page
 
 
+def _get_resource_size(response: cronet.Response) -> int | None:
+    # Responses to range requests declare the size of the whole resource in
+    # Content-Range, e.g. bytes 0-0/1234.
+    if (
+        response.status_code == HTTPStatus.PARTIAL_CONTENT.value
+        and (content_range := response.headers.get("Content-Range"))
+        is not None
+    ):
+        size = content_range.rpartition("/")[2]
+
+        return int(size) if size.isdigit() else None
+
+    return response.content_length
+
+
+def _is_page(response: cronet.Response) -> bool:
+    return (
+        response.content_type is None
+        or response.content_type in HTML_CONTENT_TYPES
+    ) and (
+        (size := _get_resource_size(response)) is None or size <= MAX_PAGE_SIZE
+    )
+
+
+async def _probe_page(
+    session: RetrySession,
+    url: URL,
+    probe_method: ProbeMethod,
+) -> Result | None:
+    try:
+        match probe_method:
+            case ProbeMethod.HEAD:
+                response = await session.head(url, allow_redirects=False)
+            case ProbeMethod.RANGE:
+                response = await session.get(
+                    url,
+                    allow_redirects=False,
+                    content_types=HTML_CONTENT_TYPES,
+                    headers=[("Range", "bytes=0-0")],
+                )
+    except RequestError:
+        return None
+
+    status_code = response.status_code
+
+    # The whole resource is available when a part of it is.
+    if status_code == HTTPStatus.PARTIAL_CONTENT.value:
+        status_code = HTTPStatus.OK.value
+
+    if status_code != HTTPStatus.OK.value or _is_page(response):
+        return None
+
+    return ScrapedData(
+        page=Page(),
+        response=Response(
+            reason=HTTPStatus(status_code).phrase,
+            redirect_url=response.redirect_url,
+            status_code=status_code,
+        ),
+    )
+
+
 async def scrape_page(
     session: RetrySession,
     url: str,
+    probe_method: ProbeMethod | None = None,
 ) -> Result:
     parsed_url = URL(url)
 
@@ -149,6 +229,15 @@ async def scrape_page(
             message = f"Unsupported URL scheme: {parsed_url.scheme}"
             raise ValueError(message)
 
+    # Falls back to a regular request unless the probe finds a non-HTML or
+    # too large resource.
+    if (
+        probe_method is not None
+        and (result := await _probe_page(session, parsed_url, probe_method))
+        is not None
+    ):
+        return result
+
     page = None
 
     async def retry_predicate(response: cronet.Response) -> bool:
@@ -159,6 +248,12 @@ async def scrape_page(
         if response.status_code != HTTPStatus.OK.value:
             return False
 
+        # Bodies of other resources aren't downloaded.
+        if not _is_page(response):
+            page = Page()
+
+            return False
+
         page = await asyncio.to_cpu_bound_giled_thread(
             _scrape_html,
             response.text,
@@ -170,6 +265,8 @@ async def scrape_page(
         response = await session.get(
             parsed_url,
             allow_redirects=False,
+            content_types=HTML_CONTENT_TYPES,
+            max_content_length=MAX_PAGE_SIZE,
             retry_predicate=retry_predicate,
         )
     except RequestError as error:
@@ -7,6 +7,249 @@ from cffi import FFI
 
 CRONET_INCLUDE = "#include <cronet_c.h>"
 
+HELPERS_CDEF = """
+    void _url_request_params_add_headers(
+        Cronet_UrlRequestParamsPtr,
+        char *[],
+        char *[],
+        size_t
+    );
+
+    typedef struct {
+        void *handle;
+        uint64_t max_body_size;
+        char *body;
+        uint64_t body_size;
+        uint64_t body_capacity;
+        Cronet_RESULT result;
+        bool out_of_memory;
+        bool skip_body;
+    } _RequestContext;
+
+    Cronet_ExecutorPtr _direct_executor_create(void);
+    Cronet_UrlRequestCallbackPtr _url_request_callback_create(void);
+    void _request_context_release_body(_RequestContext *);
+"""
+
+HELPERS_SOURCE = """
+#include <stdlib.h>
+#include <string.h>
+
+// Applies prepared headers in a single call to avoid an FFI round trip per
+// header. Cronet copies added headers, so a single header object is reused.
+static void _url_request_params_add_headers(
+    Cronet_UrlRequestParamsPtr params,
+    char *names[],
+    char *values[],
+    size_t count
+) {
+    Cronet_HttpHeaderPtr header = Cronet_HttpHeader_Create();
+
+    for (size_t i = 0; i < count; i++) {
+        Cronet_HttpHeader_name_set(header, names[i]);
+        Cronet_HttpHeader_value_set(header, values[i]);
+        Cronet_UrlRequestParams_request_headers_add(params, header);
+    }
+
+    Cronet_HttpHeader_Destroy(header);
+}
+
+static void _execute_directly(
+    Cronet_ExecutorPtr executor,
+    Cronet_RunnablePtr runnable
+) {
+    Cronet_Runnable_Run(runnable);
+    Cronet_Runnable_Destroy(runnable);
+}
+
+// Requests using this executor must allow direct execution, otherwise Cronet
+// refuses to run callbacks on its network thread.
+static Cronet_ExecutorPtr _direct_executor_create(void) {
+    return Cronet_Executor_CreateWith(_execute_directly);
+}
+
+#define RESPONSE_BODY_READ_SIZE (32 * 1024)
+
+// Shared between the Python callbacks, which use the handle, and the native
+// ones, which accumulate the response body without acquiring the GIL.
+typedef struct {
+    void *handle;
+    uint64_t max_body_size;  // 0 means unlimited.
+    char *body;
+    uint64_t body_size;
+    uint64_t body_capacity;
+    Cronet_RESULT result;
+    bool out_of_memory;
+    bool skip_body;  // Set by Python when the response starts.
+} _RequestContext;
+
+// Generated by cffi after this source.
+static void _on_request_redirect_received(
+    Cronet_UrlRequestCallbackPtr,
+    Cronet_UrlRequestPtr,
+    Cronet_UrlResponseInfoPtr,
+    Cronet_String
+);
+static void _on_request_response_started(
+    Cronet_UrlRequestCallbackPtr,
+    Cronet_UrlRequestPtr,
+    Cronet_UrlResponseInfoPtr
+);
+static void _on_request_succeeded(
+    Cronet_UrlRequestCallbackPtr,
+    Cronet_UrlRequestPtr,
+    Cronet_UrlResponseInfoPtr
+);
+static void _on_request_failed(
+    Cronet_UrlRequestCallbackPtr,
+    Cronet_UrlRequestPtr,
+    Cronet_UrlResponseInfoPtr,
+    Cronet_ErrorPtr
+);
+static void _on_request_canceled(
+    Cronet_UrlRequestCallbackPtr,
+    Cronet_UrlRequestPtr,
+    Cronet_UrlResponseInfoPtr
+);
+
+static void _request_context_release_body(_RequestContext *context) {
+    free(context->body);
+
+    context->body = NULL;
+    context->body_size = 0;
+    context->body_capacity = 0;
+}
+
+static bool _request_context_append_body(
+    _RequestContext *context,
+    const char *data,
+    uint64_t size
+) {
+    if (size == 0) {
+        return true;
+    }
+
+    if (context->max_body_size) {
+        uint64_t remaining = context->max_body_size - context->body_size;
+
+        if (size > remaining) {
+            size = remaining;
+        }
+    }
+
+    if (context->body_size + size > context->body_capacity) {
+        uint64_t capacity = context->body_capacity
+            ? context->body_capacity
+            : RESPONSE_BODY_READ_SIZE;
+
+        while (capacity < context->body_size + size) {
+            capacity *= 2;
+        }
+
+        if (context->max_body_size && capacity > context->max_body_size) {
+            capacity = context->max_body_size;
+        }
+
+        char *body = realloc(context->body, capacity);
+
+        if (body == NULL) {
+            context->out_of_memory = true;
+
+            return false;
+        }
+
+        context->body = body;
+        context->body_capacity = capacity;
+    }
+
+    memcpy(context->body + context->body_size, data, size);
+    context->body_size += size;
+
+    return true;
+}
+
+static void _read_response_body(
+    _RequestContext *context,
+    Cronet_UrlRequestPtr request,
+    Cronet_BufferPtr buffer
+) {
+    // The request takes ownership of the buffer even if the read fails.
+    // Cronet_UrlRequestImpl::Read() in components/cronet/native/url_request.cc
+    // wraps it in a std::unique_ptr before checking its state, so the buffer
+    // is freed by Cronet on failure and mustn't be destroyed here.
+    context->result = Cronet_UrlRequest_Read(request, buffer);
+
+    if (context->result < Cronet_RESULT_SUCCESS) {
+        Cronet_UrlRequest_Cancel(request);
+    }
+}
+
+static void _on_request_response_started_native(
+    Cronet_UrlRequestCallbackPtr callback,
+    Cronet_UrlRequestPtr request,
+    Cronet_UrlResponseInfoPtr response_info
+) {
+    _RequestContext *context =
+        Cronet_UrlRequestCallback_GetClientContext(callback);
+
+    _on_request_response_started(callback, request, response_info);
+
+    if (context->skip_body) {
+        Cronet_UrlRequest_Cancel(request);
+
+        return;
+    }
+
+    Cronet_BufferPtr buffer = Cronet_Buffer_Create();
+    Cronet_Buffer_InitWithAlloc(buffer, RESPONSE_BODY_READ_SIZE);
+
+    _read_response_body(context, request, buffer);
+}
+
+static void _on_request_read_completed(
+    Cronet_UrlRequestCallbackPtr callback,
+    Cronet_UrlRequestPtr request,
+    Cronet_UrlResponseInfoPtr response_info,
+    Cronet_BufferPtr buffer,
+    uint64_t bytes_read
+) {
+    _RequestContext *context =
+        Cronet_UrlRequestCallback_GetClientContext(callback);
+
+    if (
+        !_request_context_append_body(
+            context,
+            Cronet_Buffer_GetData(buffer),
+            bytes_read
+        )
+        || (
+            context->max_body_size
+            && context->body_size >= context->max_body_size
+        )
+    ) {
+        Cronet_Buffer_Destroy(buffer);
+        Cronet_UrlRequest_Cancel(request);
+
+        return;
+    }
+
+    _read_response_body(context, request, buffer);
+}
+
+// The body is read natively, so Python is only called back once the response
+// starts and once the request finishes.
+static Cronet_UrlRequestCallbackPtr _url_request_callback_create(void) {
+    return Cronet_UrlRequestCallback_CreateWith(
+        _on_request_redirect_received,
+        _on_request_response_started_native,
+        _on_request_read_completed,
+        _on_request_succeeded,
+        _on_request_failed,
+        _on_request_canceled
+    );
+}
+"""
+
 UNDEFINED_SYMBOLS = [
     "Cronet_Metrics_connect_end_move",
     "Cronet_Metrics_connect_start_move",
@@ -63,13 +306,6 @@ ffibuilder.cdef(
         Cronet_UrlRequestPtr,
         Cronet_UrlResponseInfoPtr
     );
-    extern "Python" void _on_request_read_completed(
-        Cronet_UrlRequestCallbackPtr,
-        Cronet_UrlRequestPtr,
-        Cronet_UrlResponseInfoPtr,
-        Cronet_BufferPtr,
-        uint64_t
-    );
     extern "Python" void _on_request_succeeded(
         Cronet_UrlRequestCallbackPtr,
         Cronet_UrlRequestPtr,
@@ -88,9 +324,10 @@ ffibuilder.cdef(
     );
     """,
 )
+ffibuilder.cdef(HELPERS_CDEF)
 ffibuilder.set_source(
     "bookmarkmgr.cronet._cronet",
-    f"#include <stdbool.h>\n{CRONET_INCLUDE}",
+    f"#include <stdbool.h>\n{CRONET_INCLUDE}\n{HELPERS_SOURCE}",
     libraries=["cronet"],
 )
 
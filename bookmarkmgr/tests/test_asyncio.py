@@ -0,0 +1,29 @@
+import time
+
+import pytest
+
+from bookmarkmgr.asyncio import BudgetRateLimiter
+
+LIMIT = 3
+PERIOD = 0.3
+
+
+@pytest.mark.asyncio
+async def test_budget_rate_limiter_uses_up_budget() -> None:
+    rate_limiter = BudgetRateLimiter(LIMIT, PERIOD)
+    start = time.time()
+    grants = []
+
+    # The budget is never reported, as by failed requests.
+    for _ in range(2 * LIMIT + 1):
+        async with rate_limiter:
+            grants.append(time.time() - start)
+
+    rate_limiter.close()
+
+    # No period contains more grants than the limit.
+    assert all(
+        sum(grant <= other < grant + PERIOD for other in grants) <= LIMIT
+        for grant in grants
+    )
+    assert grants[-1] >= 2 * PERIOD
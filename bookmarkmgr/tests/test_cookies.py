@@ -0,0 +1,78 @@
+from typing import TYPE_CHECKING
+
+from yarl import URL
+
+from bookmarkmgr.cronet.cookies import CookieStore
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+URL_ = URL("https://www.example.com/path/page")
+
+
+def test_domain_matching() -> None:
+    store = CookieStore()
+    store.extract_cookies(
+        URL_,
+        [
+            "host=1",
+            "domain=2; Domain=example.com",
+            "foreign=3; Domain=example.org",
+            "public-suffix=4; Domain=com",
+        ],
+    )
+
+    assert store.cookie_header(URL_) == "host=1; domain=2"
+    assert store.cookie_header(URL("https://example.com/path/")) == "domain=2"
+    assert store.cookie_header(URL("https://example.org/")) is None
+
+
+def test_path_and_secure_matching() -> None:
+    store = CookieStore()
+    store.extract_cookies(
+        URL_,
+        [
+            "root=1; Path=/",
+            "secure=2; Path=/path; Secure",
+        ],
+    )
+
+    assert store.cookie_header(URL_) == "secure=2; root=1"
+    assert store.cookie_header(URL("http://www.example.com/path")) == "root=1"
+    assert store.cookie_header(URL("https://www.example.com/paths")) == (
+        "root=1"
+    )
+
+
+def test_expiration() -> None:
+    store = CookieStore()
+    store.extract_cookies(URL_, ["a=1; Path=/; Max-Age=60"])
+    store.extract_cookies(URL_, ["a=1; Path=/; Max-Age=0"])
+    store.extract_cookies(
+        URL_,
+        ["b=2; Path=/; Expires=Thu, 01 Jan 1970 00:00:00 GMT"],
+    )
+
+    assert store.cookie_header(URL_) is None
+    assert len(store) == 0
+
+
+def test_persistence(tmp_path: Path) -> None:
+    path = tmp_path / "cookies.txt"
+
+    store = CookieStore(path)
+    store.extract_cookies(
+        URL_,
+        [
+            "persistent=1; Domain=example.com; Path=/; Max-Age=60",
+            "session=2; Path=/",
+        ],
+    )
+    store.save()
+
+    loaded_store = CookieStore(path)
+    loaded_store.load()
+
+    assert loaded_store.cookie_header(URL("https://example.com/")) == (
+        "persistent=1"
+    )
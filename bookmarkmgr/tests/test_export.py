@@ -0,0 +1,236 @@
+from datetime import datetime, UTC
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import cast, override, TYPE_CHECKING
+
+import pytest
+
+from bookmarkmgr.export import BookmarkExport, write_export_to_file
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+    from bookmarkmgr.clients.raindrop import (
+        Collection,
+        RaindropIn,
+        RaindropOut,
+    )
+
+# Export of a collection as written by export-collection --output.
+RAINDROP_EXPORT_PATH = Path(__file__).parent / "fixtures/raindrop-export.html"
+
+
+class _ExportParser(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__()
+
+        self.collection: Collection | None = None
+        self.raindrops: list[RaindropOut] = []
+
+        self._attrs: dict[str, str] = {}
+        self._tag: str | None = None
+
+    @override
+    def handle_starttag(
+        self,
+        tag: str,
+        attrs: list[tuple[str, str | None]],
+    ) -> None:
+        self._attrs = {name: value or "" for name, value in attrs}
+        self._tag = tag
+
+    @override
+    def handle_endtag(self, tag: str) -> None:
+        self._tag = None
+
+    @override
+    def handle_data(self, data: str) -> None:
+        match self._tag:
+            case "h3":
+                self.collection = {
+                    "_id": 1,
+                    "title": data,
+                    "created": _isoformat(self._attrs["add_date"]),
+                    "lastUpdate": _isoformat(self._attrs["last_modified"]),
+                }
+            case "a":
+                # Raindrops of the same time are exported in order of their
+                # decreasing IDs.
+                self.raindrops.append(
+                    cast(
+                        "RaindropOut",
+                        {
+                            "_id": -len(self.raindrops),
+                            "cover": self._attrs["data-cover"],
+                            "created": _isoformat(self._attrs["add_date"]),
+                            "lastUpdate": _isoformat(
+                                self._attrs["last_modified"],
+                            ),
+                            "link": self._attrs["href"],
+                            "note": "",
+                            "tags": (
+                                self._attrs["tags"].split(",")
+                                if self._attrs["tags"]
+                                else []
+                            ),
+                            "title": data,
+                        },
+                    ),
+                )
+            case "dd":
+                # Notes are followed by a newline and indentation.
+                self.raindrops[-1]["note"] = data[: data.rindex("\n")]
+            case _:
+                return
+
+        self._tag = None
+
+
+def _isoformat(timestamp: str) -> str:
+    return datetime.fromtimestamp(int(timestamp), tz=UTC).isoformat()
+
+
+def _collection(collection_id: int) -> Collection:
+    return {
+        "_id": collection_id,
+        "title": "Example",
+        "created": "2024-01-01T00:00:00.000Z",
+        "lastUpdate": "2025-01-01T00:00:00.000Z",
+    }
+
+
+def _raindrop(raindrop_id: int, created: str) -> RaindropOut:
+    return {
+        "_id": raindrop_id,
+        "cover": "",
+        "created": created,
+        "link": f"https://example.com/{raindrop_id}?a=1&b=2",
+        "note": "",
+        "tags": [],
+        "title": f"<Example {raindrop_id}>",
+    }
+
+
+async def _render(export: BookmarkExport, collection: Collection) -> str:
+    return b"".join(
+        [chunk async for chunk in export.render(collection)],
+    ).decode()
+
+
+@pytest.mark.asyncio
+async def test_render() -> None:
+    export = BookmarkExport()
+    export.add(1, _raindrop(1, "2025-01-01T00:00:00.000Z"))
+    export.add(1, _raindrop(2, "2025-01-02T00:00:00.000Z"))
+    export.add(2, _raindrop(3, "2025-01-03T00:00:00.000Z"))
+
+    export.update(
+        1,
+        cast("RaindropIn", {"note": "Last check: now", "tags": ["broken"]}),
+    )
+
+    html = await _render(export, _collection(1))
+
+    assert html.startswith("<!DOCTYPE NETSCAPE-Bookmark-file-1>\n")
+    assert html.endswith("    </DL><p>\n</DL><p>")
+    assert (
+        '<DT><H3 ADD_DATE="1704067200" LAST_MODIFIED="1735689600">Example</H3>'
+        in html
+    )
+    assert "example.com/3" not in html
+    assert html.index("example.com/2") < html.index("example.com/1")
+    assert (
+        '<A HREF="https://example.com/1?a=1&amp;b=2" ADD_DATE="1735689600" '
+        in html
+    )
+    assert 'TAGS="broken"' in html
+    assert "&lt;Example 1&gt;</A>\n        <DD>Last check: now\n" in html
+
+
+@pytest.mark.asyncio
+async def test_render_raindrop_export() -> None:
+    raindrop_export = RAINDROP_EXPORT_PATH.read_text()
+
+    parser = _ExportParser()
+    parser.feed(raindrop_export)
+    parser.close()
+
+    assert parser.collection is not None
+    assert parser.raindrops
+
+    export = BookmarkExport()
+
+    for raindrop in parser.raindrops:
+        export.add(1, raindrop)
+
+    assert f"{await _render(export, parser.collection)}\n" == raindrop_export
+
+
+@pytest.mark.asyncio
+async def test_write_export_to_file(tmp_path: Path) -> None:
+    path = tmp_path / "bookmarks.html"
+
+    async def chunks(*values: bytes) -> AsyncIterator[bytes]:
+        for value in values:
+            yield value
+
+    await write_export_to_file(chunks(b"a", b"b"), path)
+
+    assert path.read_bytes() == b"ab\n"
+
+    modified_at = path.stat().st_mtime_ns
+
+    await write_export_to_file(chunks(b"ab"), path)
+
+    assert path.stat().st_mtime_ns == modified_at
+
+    await write_export_to_file(chunks(b"c"), path)
+
+    assert path.read_bytes() == b"c\n"
+
+
+@pytest.mark.asyncio
+async def test_write_indexed(tmp_path: Path) -> None:
+    path = tmp_path / "bookmarks.html"
+    index_path = tmp_path / "bookmarks.index"
+
+    export = BookmarkExport()
+    export.add(1, _raindrop(1, "2025-01-01T00:00:00.000Z"))
+    export.add(1, _raindrop(2, "2025-01-02T00:00:00.000Z"))
+    export.add(1, _raindrop(3, "2025-01-03T00:00:00.000Z"))
+
+    collection = _collection(1)
+
+    async def assert_export_matches() -> None:
+        await export.write_indexed(collection, path, index_path)
+
+        assert path.read_text() == f"{await _render(export, collection)}\n"
+
+    await assert_export_matches()
+
+    inode = path.stat().st_ino
+
+    # Entries of the same length are patched in place, in a copy of the
+    # export replacing it.
+    export.update(2, cast("RaindropIn", {"tags": ["a"]}))
+    await assert_export_matches()
+
+    assert path.stat().st_ino != inode
+    assert not path.with_name(f".{path.name}.tmp").exists()
+
+    # Entries following a longer entry are shifted.
+    export.update(3, cast("RaindropIn", {"note": "Last check: now"}))
+    export.update(1, cast("RaindropIn", {"tags": ["b"]}))
+    await assert_export_matches()
+
+    # Added entries change the structure.
+    export.add(1, _raindrop(4, "2025-01-04T00:00:00.000Z"))
+    await assert_export_matches()
+
+    # Changed headers are rewritten.
+    collection["lastUpdate"] = "2025-01-05T00:00:00.000Z"
+    await assert_export_matches()
+
+    # Modified exports are written whole.
+    path.write_text("")
+    await assert_export_matches()
@@ -0,0 +1,109 @@
+import contextlib
+from typing import cast, TYPE_CHECKING
+
+from bookmarkmgr.journal import Journal
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from bookmarkmgr.clients.raindrop import RaindropIn
+
+
+# Updates journaled by maintenance contain only changed fields.
+def _update(**fields: object) -> RaindropIn:
+    return cast("RaindropIn", fields)
+
+
+def test_resume(tmp_path: Path) -> None:
+    path = tmp_path / "journal.jsonl"
+
+    # Interrupted runs are resumed.
+    with contextlib.suppress(KeyboardInterrupt), Journal(path) as journal:
+        journal.record_archival_job(1, "AT", "https://example.com/", "job")
+        journal.record_update(1, _update(tags=["archived"]), completed=True)
+        journal.record_update(2, _update(note="note"), completed=True)
+        journal.record_sent(2)
+        journal.record_update(3, _update(tags=["broken"]), completed=False)
+        journal.record_update(4, _update(), completed=True)
+
+        raise KeyboardInterrupt
+
+    with path.open("a") as file:
+        file.write('{"type": "sent", "id"')
+
+    with (
+        contextlib.suppress(KeyboardInterrupt),
+        Journal(path, resume=True) as journal,
+    ):
+        assert journal.completed == {1, 2, 4}
+        assert journal.pending_updates == {
+            1: {"tags": ["archived"]},
+            3: {"tags": ["broken"]},
+        }
+        assert journal.archival_job(1, "AT", "https://example.com/") == "job"
+        assert journal.archival_job(1, "AT", "https://example.org/") is None
+        assert journal.archival_job(1, "WM", "https://example.com/") is None
+
+        journal.record_sent(1)
+
+        raise KeyboardInterrupt
+
+    with Journal(path, resume=True) as journal:
+        assert journal.pending_updates == {3: {"tags": ["broken"]}}
+
+    with Journal(path) as journal:
+        assert not journal.completed
+
+
+def test_resume_finished_run(tmp_path: Path) -> None:
+    path = tmp_path / "journal.jsonl"
+
+    with Journal(path) as journal:
+        journal.record_archival_job(1, "AT", "https://example.com/", "job")
+        journal.record_update(1, _update(tags=["archived"]), completed=True)
+        journal.record_update(2, _update(tags=["broken"]), completed=True)
+        journal.record_sent(2)
+
+    with Journal(path, resume=True) as journal:
+        assert not journal.completed
+        assert journal.pending_updates == {1: {"tags": ["archived"]}}
+        assert journal.archival_job(1, "AT", "https://example.com/") is None
+
+
+def test_read(tmp_path: Path) -> None:
+    path = tmp_path / "journal.jsonl"
+
+    with contextlib.suppress(KeyboardInterrupt), Journal(path) as journal:
+        journal.record_update(1, _update(tags=["archived"]), completed=True)
+
+        raise KeyboardInterrupt
+
+    with path.open("a") as file:
+        file.write('{"type": "sent", "id"')
+
+    contents = path.read_bytes()
+    journal = Journal(path, resume=True)
+    journal.read()
+
+    assert journal.completed == {1}
+    assert journal.pending_updates == {1: {"tags": ["archived"]}}
+    # Read journals are left as they are, to be resumed later.
+    assert path.read_bytes() == contents
+
+
+def test_is_unfinished(tmp_path: Path) -> None:
+    path = tmp_path / "journal.jsonl"
+
+    assert not Journal.is_unfinished(path)
+
+    with contextlib.suppress(KeyboardInterrupt), Journal(path) as journal:
+        journal.record_update(1, _update(tags=["archived"]), completed=True)
+
+        raise KeyboardInterrupt
+
+    assert Journal.is_unfinished(path)
+
+    with Journal(path, resume=True):
+        pass
+
+    assert not Journal.is_unfinished(path)
@@ -0,0 +1,97 @@
+from typing import cast, TYPE_CHECKING
+
+import pytest
+
+from bookmarkmgr.commands.maintain_collection import send_raindrop_update
+from bookmarkmgr.export import BookmarkExport
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from bookmarkmgr.clients.raindrop import (
+        RaindropClient,
+        RaindropIn,
+        RaindropOut,
+    )
+
+
+class _RaindropClient:
+    def __init__(self) -> None:
+        self.tag_additions: list[tuple[int, list[str]]] = []
+        self.updates: list[tuple[int, RaindropIn]] = []
+
+    async def add_raindrop_tags(
+        self,
+        raindrop_id: int,
+        tags: Iterable[str],
+    ) -> None:
+        self.tag_additions.append((raindrop_id, list(tags)))
+
+    async def update_raindrop(
+        self,
+        raindrop_id: int,
+        raindrop: RaindropIn,
+    ) -> None:
+        self.updates.append((raindrop_id, raindrop))
+
+
+# Updates sent by maintenance contain only changed fields.
+def _update(**fields: object) -> RaindropIn:
+    return cast("RaindropIn", fields)
+
+
+def _raindrop(tags: list[str]) -> RaindropOut:
+    return {
+        "_id": 1,
+        "cover": "",
+        "created": "2025-01-01T00:00:00.000Z",
+        "link": "https://example.com/",
+        "note": "",
+        "tags": tags,
+        "title": "Example",
+    }
+
+
+@pytest.mark.asyncio
+async def test_send_raindrop_update_adds_tags_in_bulk() -> None:
+    client = _RaindropClient()
+    export = BookmarkExport()
+    export.add(1, _raindrop(["duplicate", "blocked"]))
+
+    # Archival adds a tag and rewrites the note.
+    await send_raindrop_update(
+        cast("RaindropClient", client),
+        1,
+        _update(
+            note="Archive (AT): link",
+            tags=["archived", "blocked", "duplicate"],
+        ),
+        None,
+        export=export,
+        original_tags=["duplicate", "blocked"],
+    )
+
+    assert client.tag_additions == [(1, ["archived"])]
+    assert client.updates == [(1, {"note": "Archive (AT): link"})]
+    # Raindrop appends tags added in bulk.
+    assert export.get_raindrops(1)[0]["tags"] == [
+        "duplicate",
+        "blocked",
+        "archived",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_send_raindrop_update_removes_tags() -> None:
+    client = _RaindropClient()
+
+    await send_raindrop_update(
+        cast("RaindropClient", client),
+        1,
+        _update(tags=["archived"]),
+        None,
+        original_tags=["archived", "broken"],
+    )
+
+    assert not client.tag_additions
+    assert client.updates == [(1, {"tags": ["archived"]})]
@@ -0,0 +1,341 @@
+import asyncio
+import contextlib
+import json
+from typing import cast, override, TYPE_CHECKING
+
+import pytest
+
+from bookmarkmgr.clients import raindrop
+from bookmarkmgr.clients.raindrop import (
+    _decode_collection_page_msgspec,
+    _decode_collection_page_stdlib,
+    _parse_csv_records,
+    _parse_last_update,
+    _PREFETCH_PAGES,
+    CollectionSnapshot,
+    RaindropClient,
+    RAINDROPS_PER_PAGE,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Callable, Iterable
+    from pathlib import Path
+
+    from bookmarkmgr.clients.raindrop import (
+        _ListedCollectionPage,
+        CollectionPage,
+        RaindropIn,
+        RaindropOut,
+    )
+
+PAGE_COUNT = 10
+
+_LISTED_RAINDROP = {
+    "_id": 1,
+    "cover": "",
+    "created": "2025-01-01T00:00:00.000Z",
+    "lastUpdate": "2025-01-02T00:00:00.000Z",
+    "link": "https://example.com/",
+    "note": "",
+    "tags": ["archived"],
+    "title": "Example",
+}
+
+
+DECODERS = [
+    pytest.param(_decode_collection_page_stdlib, id="stdlib"),
+    pytest.param(
+        _decode_collection_page_msgspec,
+        id="msgspec",
+        marks=pytest.mark.skipif(
+            _decode_collection_page_msgspec is None,
+            reason="msgspec isn't installed",
+        ),
+    ),
+]
+
+
+@pytest.mark.parametrize("decode_collection_page", DECODERS)
+def test_decode_collection_page(
+    decode_collection_page: Callable[[bytes], _ListedCollectionPage],
+) -> None:
+    page = {
+        "count": 1,
+        "items": [{**_LISTED_RAINDROP, "excerpt": "Unused"}],
+        "result": True,
+    }
+
+    # Unused fields are dropped.
+    assert decode_collection_page(json.dumps(page).encode()) == {
+        "count": 1,
+        "items": [_LISTED_RAINDROP],
+    }
+
+
+@pytest.mark.parametrize(
+    "page",
+    [
+        {"items": [_LISTED_RAINDROP]},
+        {
+            "count": 1,
+            "items": [
+                {
+                    key: value
+                    for key, value in _LISTED_RAINDROP.items()
+                    if key != "lastUpdate"
+                },
+            ],
+        },
+    ],
+    ids=["count", "lastUpdate"],
+)
+@pytest.mark.parametrize("decode_collection_page", DECODERS)
+def test_decode_collection_page_missing_field(
+    decode_collection_page: Callable[[bytes], _ListedCollectionPage],
+    page: dict[str, object],
+) -> None:
+    with contextlib.suppress(ValueError):
+        decode_collection_page(json.dumps(page).encode())
+        pytest.fail("Missing field wasn't rejected")
+
+
+class _RaindropClient(RaindropClient):
+    def __init__(self, items: Iterable[RaindropOut] = ()) -> None:
+        super().__init__("API key")
+
+        self.items = list(items)
+        self.fetched_pages: list[tuple[int, str | None]] = []
+        self.fetching_page_count = 0
+        self.max_fetching_page_count = 0
+        self.tag_additions: list[tuple[list[int], list[str]]] = []
+        self.updates: list[tuple[int, RaindropIn]] = []
+
+    @override
+    async def _put_raindrop(
+        self,
+        raindrop_id: int,
+        raindrop: RaindropIn,
+    ) -> None:
+        if "link" in raindrop:
+            message = "Invalid link"
+            raise ValueError(message)
+
+        self.updates.append((raindrop_id, raindrop))
+
+    @override
+    async def _put_raindrops_tags(
+        self,
+        raindrop_ids: Iterable[int],
+        tags: Iterable[str],
+    ) -> None:
+        self.tag_additions.append((list(raindrop_ids), sorted(tags)))
+
+    @override
+    async def get_collection_page(
+        self,
+        collection_id: int,
+        page: int,
+        *,
+        search: str | None = None,
+        sort: str | None = None,
+    ) -> CollectionPage:
+        self.fetched_pages.append((page, sort))
+        self.fetching_page_count += 1
+        self.max_fetching_page_count = max(
+            self.max_fetching_page_count,
+            self.fetching_page_count,
+        )
+
+        try:
+            await asyncio.sleep(0)
+        finally:
+            self.fetching_page_count -= 1
+
+        items = self.items
+
+        if sort == "-lastUpdate":
+            items = sorted(items, key=_last_update, reverse=True)
+
+        start = page * RAINDROPS_PER_PAGE
+
+        return {
+            "count": len(items),
+            "items": items[start : start + RAINDROPS_PER_PAGE],
+        }
+
+
+def _last_update(item: RaindropOut) -> str:
+    return cast("dict[str, str]", item)["lastUpdate"]
+
+
+def _raindrop(raindrop_id: int, last_update: str) -> RaindropOut:
+    return cast(
+        "RaindropOut",
+        {
+            **_LISTED_RAINDROP,
+            "_id": raindrop_id,
+            "lastUpdate": f"2025-01-{last_update}T00:00:00.000Z",
+        },
+    )
+
+
+# Updates contain only changed fields.
+def _update(**fields: object) -> RaindropIn:
+    return cast("RaindropIn", fields)
+
+
+async def _iter_chunks(data: bytes, size: int) -> AsyncIterator[bytes]:
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunk_size", [1, 7, 1024])
+async def test_parse_csv_records(chunk_size: int) -> None:
+    data = (
+        "\ufeffid,title,note\r\n"
+        '1,"Say ""hi""","Line 1\r\n\r\n""Line"" 3"\r\n'
+        "2,Café,\r\n"
+    ).encode()
+
+    # Records are split across chunks, even within characters.
+    records = [
+        record
+        async for record in _parse_csv_records(
+            _iter_chunks(data, chunk_size),
+        )
+    ]
+
+    assert records == [
+        {"id": "1", "title": 'Say "hi"', "note": 'Line 1\r\n\r\n"Line" 3'},
+        {"id": "2", "title": "Café", "note": ""},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_raindrop_client_coalesces_writes(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(raindrop, "_WRITE_BEHIND_DELAY", 0)
+
+    async with _RaindropClient() as client:
+        results = await asyncio.gather(
+            client.update_raindrop(1, _update(note="Note")),
+            client.update_raindrop(1, _update(title="Title")),
+            client.add_raindrop_tags(2, ["archived"]),
+            client.add_raindrop_tags(3, ["archived"]),
+            client.add_raindrop_tags(4, ["archived", "broken"]),
+            client.update_raindrop(5, _update(link="invalid")),
+            client.add_raindrop_tags(5, ["archived"]),
+            return_exceptions=True,
+        )
+
+    # Writes of the failed update fail too.
+    assert results[:5] == [None] * 5
+    assert all(isinstance(result, ValueError) for result in results[5:])
+    assert client.updates == [(1, {"note": "Note", "title": "Title"})]
+    assert client.tag_additions == [
+        ([2, 3], ["archived"]),
+        ([4], ["archived", "broken"]),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_raindrop_client_prefetches_pages() -> None:
+    items = [
+        _raindrop(raindrop_id, "01")
+        for raindrop_id in range(PAGE_COUNT * RAINDROPS_PER_PAGE)
+    ]
+
+    async with _RaindropClient(items) as client:
+        assert [item async for item in client.get_collection_items(1)] == items
+
+        assert client.max_fetching_page_count <= _PREFETCH_PAGES
+
+        # Iteration stopped early cancels prefetched pages.
+        async with contextlib.aclosing(
+            client.get_collection_items(1),
+        ) as loaded_items:
+            async for _ in loaded_items:
+                break
+
+    assert client.fetching_page_count == 0
+
+
+@pytest.mark.asyncio
+async def test_raindrop_client_updates_snapshot(tmp_path: Path) -> None:
+    snapshot = CollectionSnapshot(tmp_path / "snapshot.json", 1)
+    snapshot.update([_raindrop(1, "01"), _raindrop(2, "02")])
+    snapshot.save()
+
+    # Raindrops updated at the high-water mark are loaded again.
+    items = [_raindrop(1, "01"), _raindrop(2, "03"), _raindrop(3, "02")]
+
+    async with _RaindropClient(items) as client:
+        loaded_items = [
+            item
+            async for item in client.get_collection_items(
+                1,
+                snapshot=CollectionSnapshot(snapshot.path, 1),
+            )
+        ]
+
+    assert sorted(loaded_items, key=lambda item: item["_id"]) == items
+    assert client.fetched_pages == [(0, "-lastUpdate")]
+
+    snapshot.load()
+
+    assert snapshot.items == {item["_id"]: item for item in items}
+    assert snapshot.high_water_mark == _parse_last_update(items[1])
+
+
+@pytest.mark.asyncio
+async def test_raindrop_client_reloads_snapshot(tmp_path: Path) -> None:
+    snapshot = CollectionSnapshot(tmp_path / "snapshot.json", 1)
+    snapshot.update([_raindrop(1, "01"), _raindrop(2, "02")])
+    snapshot.save()
+
+    # Removed raindrops are detected by the count.
+    items = [_raindrop(2, "02")]
+
+    async with _RaindropClient(items) as client:
+        loaded_items = [
+            item
+            async for item in client.get_collection_items(
+                1,
+                snapshot=snapshot,
+            )
+        ]
+
+    assert loaded_items == items
+    assert client.fetched_pages == [(0, "-lastUpdate"), (0, None)]
+
+
+@pytest.mark.asyncio
+async def test_raindrop_client_keeps_read_only_snapshot(
+    tmp_path: Path,
+) -> None:
+    snapshot = CollectionSnapshot(tmp_path / "snapshot.json", 1)
+    snapshot.update([_raindrop(1, "01")])
+    snapshot.save()
+
+    items = [_raindrop(1, "01"), _raindrop(2, "02")]
+
+    async with _RaindropClient(items) as client:
+        loaded_items = [
+            item
+            async for item in client.get_collection_items(
+                1,
+                snapshot=CollectionSnapshot(
+                    snapshot.path,
+                    1,
+                    read_only=True,
+                ),
+            )
+        ]
+
+    assert sorted(loaded_items, key=lambda item: item["_id"]) == items
+
+    snapshot.load()
+
+    assert list(snapshot.items) == [1]
@@ -0,0 +1,110 @@
+from collections import Counter
+import contextlib
+from typing import TYPE_CHECKING
+
+import pytest
+from yarl import URL
+
+from bookmarkmgr.checks.link_status import LinkStatus
+from bookmarkmgr.checks.workers import (
+    CheckWorkerError,
+    CheckWorkerPool,
+    get_worker_index,
+)
+from bookmarkmgr.commands.maintain_collection import is_in_shard
+from bookmarkmgr.cronet.cookies import CookieStore
+from bookmarkmgr.scraper import Page
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from bookmarkmgr.checks.link_status import LinkCheckResult
+    from bookmarkmgr.cronet import RetrySession
+    from bookmarkmgr.scraper import ProbeMethod
+
+WORKER_COUNT = 4
+HOSTS = [f"example{index}.com" for index in range(8)]
+
+
+# Checks are run by workers, so the stub has to be picklable.
+async def _check_link(
+    session: RetrySession,
+    url: str,
+    probe_method: ProbeMethod | None = None,  # noqa: ARG001
+) -> LinkCheckResult:
+    if URL(url).path == "/error":
+        message = "Check failed"
+        raise ValueError(message)
+
+    session.cookie_jar.extract_cookies(URL(url), ["checked=1; Max-Age=60"])
+
+    return Page(body_text="Body", title=url), LinkStatus.OK, None, None
+
+
+def test_get_worker_index() -> None:
+    index = get_worker_index("example.co.uk", WORKER_COUNT)
+
+    assert 0 <= index < WORKER_COUNT
+    assert get_worker_index("WWW.example.co.uk", WORKER_COUNT) == index
+    assert get_worker_index("a.b.example.co.uk", WORKER_COUNT) == index
+
+
+@pytest.mark.parametrize(
+    ("shard_count", "worker_count"),
+    [(2, 2), (4, 2), (2, 4), (3, 6)],
+)
+def test_get_worker_index_in_shard(
+    shard_count: int,
+    worker_count: int,
+) -> None:
+    hosts = [
+        host
+        for host in (f"example{index}.com" for index in range(1000))
+        if is_in_shard(f"https://{host}/", (1, shard_count))
+    ]
+    worker_host_counts = Counter(
+        get_worker_index(host, worker_count) for host in hosts
+    )
+
+    # Hosts of a shard are spread over all workers.
+    assert len(worker_host_counts) == worker_count
+    assert min(worker_host_counts.values()) > len(hosts) / worker_count / 2
+
+
+@pytest.mark.asyncio
+async def test_check_worker_pool(tmp_path: Path) -> None:
+    cookie_file = tmp_path / "cookies.txt"
+
+    cookie_store = CookieStore(cookie_file)
+    cookie_store.extract_cookies(
+        URL("https://loaded.com/"),
+        ["loaded=1; Max-Age=60"],
+    )
+    cookie_store.save()
+
+    async with CheckWorkerPool(
+        WORKER_COUNT,
+        cookie_file=cookie_file,
+        host_rate_limits=[],
+        checker=_check_link,
+    ) as pool:
+        for host in HOSTS:
+            url = f"https://{host}/"
+            page, link_status, error, fixed_url = await pool.check_link(url)
+
+            assert page == Page(title=url)
+            assert link_status == LinkStatus.OK
+            assert error is None
+            assert fixed_url is None
+
+        with contextlib.suppress(CheckWorkerError):
+            await pool.check_link(f"https://{HOSTS[0]}/error")
+            pytest.fail("Error of check wasn't raised")
+
+    # Cookies set by all workers are merged with the loaded ones.
+    cookie_store = CookieStore(cookie_file)
+    cookie_store.load()
+
+    assert sorted(cookie.domain for cookie in cookie_store) == sorted(
+        [*HOSTS, "loaded.com"],
+    )
@@ -63,7 +63,7 @@ def parse_bookmarks(html):  # noqa: C901
                 item["metadata"] = {
                     key: value
                     for key, value in metadata_from_note(data).items()
-                    if key != "Last check"
+                    if key not in {"Last check", "OK streak"}
                 }
 
     html_parser = HTMLParser()